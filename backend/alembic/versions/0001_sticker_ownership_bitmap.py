@@ -0,0 +1,90 @@
+"""sticker slots and collector album ownership bitmap
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Number existing stickers within each album by sticker number, comparing
+    # the digits numerically so "2" comes before "10"; purely numeric numbers
+    # come first, then prefixed ones such as "FWC1" by their number
+    op.add_column("stickers", sa.Column("sticker_slot", sa.Integer(), nullable=True))
+    op.execute(
+        r"""
+        UPDATE stickers
+        SET sticker_slot = numbered.slot
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY album_id ORDER BY
+                    (sticker_number ~ '^\d+$') DESC,
+                    NULLIF(regexp_replace(sticker_number, '\D', '', 'g'), '')::bigint,
+                    sticker_number,
+                    id
+            ) - 1 AS slot
+            FROM stickers
+        ) AS numbered
+        WHERE stickers.id = numbered.id
+        """
+    )
+    op.alter_column("stickers", "sticker_slot", nullable=False)
+    op.create_unique_constraint(
+        "uq_stickers_album_slot", "stickers", ["album_id", "sticker_slot"]
+    )
+
+    op.add_column(
+        "collector_albums",
+        sa.Column(
+            "collector_album_owned_bitmap",
+            sa.LargeBinary(),
+            nullable=False,
+            server_default="",
+        ),
+    )
+
+    # Build the bitmaps from the stickers collectors already own
+    connection = op.get_bind()
+    owned = connection.execute(
+        sa.text(
+            """
+            SELECT DISTINCT cs.collector_album_id, s.sticker_slot
+            FROM collector_stickers cs
+            JOIN stickers s ON s.id = cs.sticker_id
+            WHERE cs.collector_stickers_quantity > 0
+            """
+        )
+    )
+    bitmaps = defaultdict(bytearray)
+    for collector_album_id, slot in owned:
+        bitmap = bitmaps[collector_album_id]
+        if len(bitmap) <= slot // 8:
+            bitmap.extend(b"\x00" * (slot // 8 + 1 - len(bitmap)))
+        bitmap[slot // 8] |= 1 << (slot % 8)
+
+    for collector_album_id, bitmap in bitmaps.items():
+        connection.execute(
+            sa.text(
+                "UPDATE collector_albums SET collector_album_owned_bitmap = :bitmap "
+                "WHERE id = :id"
+            ),
+            {"bitmap": bytes(bitmap), "id": collector_album_id},
+        )
+
+
+def downgrade():
+    op.drop_column("collector_albums", "collector_album_owned_bitmap")
+    op.drop_constraint("uq_stickers_album_slot", "stickers", type_="unique")
+    op.drop_column("stickers", "sticker_slot")
@@ -0,0 +1,72 @@
+"""merge duplicate collector items and add unique keys
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+# (table, owner column, item column, quantity column, duplicate flag, constraint)
+COLLECTOR_TABLES = [
+    ("collector_stickers", "collector_album_id", "sticker_id",
+     "collector_stickers_quantity", "collector_stickers_is_duplicate",
+     "uq_collector_stickers_album_sticker"),
+    ("collector_cards", "collector_id", "card_id",
+     "collector_card_quantity", "collector_card_is_duplicate",
+     "uq_collector_cards_collector_card"),
+    ("collector_packs", "collector_id", "pack_id",
+     "collector_pack_quantity", None,
+     "uq_collector_packs_collector_pack"),
+    ("collector_boxes", "collector_id", "box_id",
+     "collector_box_quantity", None,
+     "uq_collector_boxes_collector_box"),
+    ("collector_memorabilia", "collector_id", "memorabilia_id",
+     "collector_memorabilia_quantity", None,
+     "uq_collector_memorabilia_collector_memorabilia"),
+]
+
+
+def upgrade():
+    for table, owner, item, quantity, duplicate, constraint in COLLECTOR_TABLES:
+        duplicate_update = (
+            f", {duplicate} = merged.total > 1" if duplicate else ""
+        )
+        # Fold every duplicate group into its oldest row...
+        op.execute(
+            f"""
+            UPDATE {table}
+            SET {quantity} = merged.total{duplicate_update}
+            FROM (
+                SELECT MIN(id) AS keep_id, SUM({quantity}) AS total
+                FROM {table}
+                GROUP BY {owner}, {item}
+                HAVING COUNT(*) > 1
+            ) AS merged
+            WHERE {table}.id = merged.keep_id
+            """
+        )
+        # ...then drop the rows that were folded into it
+        op.execute(
+            f"""
+            DELETE FROM {table} AS extra
+            USING {table} AS kept
+            WHERE extra.{owner} = kept.{owner}
+              AND extra.{item} = kept.{item}
+              AND extra.id > kept.id
+            """
+        )
+        op.create_unique_constraint(constraint, table, [owner, item])
+
+
+def downgrade():
+    for table, _, _, _, _, constraint in COLLECTOR_TABLES:
+        op.drop_constraint(constraint, table, type_="unique")
@@ -0,0 +1,91 @@
+"""numeric collector album completion counters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "collector_albums",
+        sa.Column(
+            "collector_album_distinct_stickers_owned",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+        ),
+    )
+    op.add_column(
+        "collector_albums",
+        sa.Column(
+            "collector_album_completion_percentage",
+            sa.Float(),
+            nullable=False,
+            server_default="0",
+        ),
+    )
+
+    # Derive the counters from the stickers collectors already own
+    op.execute(
+        """
+        UPDATE collector_albums
+        SET collector_album_total_stickers_owned = COALESCE(owned.total, 0),
+            collector_album_distinct_stickers_owned = COALESCE(owned.distinct_owned, 0)
+        FROM collector_albums AS ca
+        LEFT JOIN (
+            SELECT collector_album_id,
+                   SUM(collector_stickers_quantity) AS total,
+                   COUNT(DISTINCT sticker_id) FILTER (
+                       WHERE collector_stickers_quantity > 0
+                   ) AS distinct_owned
+            FROM collector_stickers
+            GROUP BY collector_album_id
+        ) AS owned ON owned.collector_album_id = ca.id
+        WHERE collector_albums.id = ca.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE collector_albums
+        SET collector_album_completion_percentage = LEAST(
+                collector_album_distinct_stickers_owned * 100.0 / albums.album_total_stickers,
+                100
+            )
+        FROM albums
+        WHERE albums.id = collector_albums.album_id
+          AND albums.album_total_stickers > 0
+        """
+    )
+    op.execute(
+        """
+        UPDATE collector_albums
+        SET collector_album_completion =
+            FLOOR(collector_album_completion_percentage)::integer || '%'
+        """
+    )
+
+    op.create_index(
+        "ix_collector_albums_collector_album_completion_percentage",
+        "collector_albums",
+        ["collector_album_completion_percentage"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_collector_albums_collector_album_completion_percentage",
+        table_name="collector_albums",
+    )
+    op.drop_column("collector_albums", "collector_album_completion_percentage")
+    op.drop_column("collector_albums", "collector_album_distinct_stickers_owned")
@@ -0,0 +1,47 @@
+"""competition statistics rollup
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "competition_statistics",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("competition_id", sa.Integer(), nullable=False),
+        sa.Column("competition_statistics_total_albums", sa.Integer(), nullable=False),
+        sa.Column("competition_statistics_total_cards", sa.Integer(), nullable=False),
+        sa.Column("competition_statistics_total_collectors", sa.Integer(), nullable=False),
+        sa.Column("competition_statistics_completion_rate", sa.Float(), nullable=False),
+        sa.Column("competition_statistics_average_completion", sa.Float(), nullable=False),
+        sa.Column("competition_statistics_most_collected_albums", sa.JSON(), nullable=False),
+        sa.Column("competition_statistics_most_collected_cards", sa.JSON(), nullable=False),
+        sa.Column("competition_statistics_trading_volume", sa.Integer(), nullable=False),
+        sa.Column("competition_statistics_is_stale", sa.Boolean(), nullable=False),
+        sa.Column("competition_statistics_refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["competition_id"], ["competitions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("competition_id"),
+    )
+    op.create_index(
+        op.f("ix_competition_statistics_id"), "competition_statistics", ["id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_competition_statistics_id"), table_name="competition_statistics")
+    op.drop_table("competition_statistics")
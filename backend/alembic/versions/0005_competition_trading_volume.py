@@ -0,0 +1,84 @@
+"""daily trading volume per competition
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "competition_trading_volume",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("competition_id", sa.Integer(), nullable=False),
+        sa.Column("competition_trading_volume_date", sa.Date(), nullable=False),
+        sa.Column("competition_trading_volume_quantity", sa.Integer(), nullable=False),
+        sa.Column("competition_trading_volume_movements", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["competition_id"], ["competitions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "competition_id",
+            "competition_trading_volume_date",
+            name="uq_competition_trading_volume_day",
+        ),
+    )
+    op.create_index(
+        op.f("ix_competition_trading_volume_id"), "competition_trading_volume", ["id"], unique=False
+    )
+
+    # Aggregate the existing movement ledger into daily buckets
+    op.execute(
+        """
+        INSERT INTO competition_trading_volume (
+            competition_id,
+            competition_trading_volume_date,
+            competition_trading_volume_quantity,
+            competition_trading_volume_movements
+        )
+        SELECT COALESCE(c.competition_id, a.competition_id),
+               CAST(m.inventory_movement_created_at AS DATE),
+               SUM(m.inventory_movement_quantity),
+               COUNT(*)
+        FROM inventory_movement m
+        JOIN company_inventory ci ON ci.id = m.inventory_id
+        LEFT JOIN cards c
+            ON ci.company_inventory_item_type = 'card' AND c.id = ci.company_inventory_item_id
+        LEFT JOIN stickers s
+            ON ci.company_inventory_item_type = 'sticker' AND s.id = ci.company_inventory_item_id
+        LEFT JOIN packs p
+            ON ci.company_inventory_item_type = 'pack' AND p.id = ci.company_inventory_item_id
+        LEFT JOIN boxes b
+            ON ci.company_inventory_item_type = 'box' AND b.id = ci.company_inventory_item_id
+        LEFT JOIN memorabilia mm
+            ON ci.company_inventory_item_type = 'memorabilia' AND mm.id = ci.company_inventory_item_id
+        LEFT JOIN albums a
+            ON a.id = COALESCE(s.album_id, p.album_id, b.album_id, mm.album_id)
+        WHERE m.trade_request_id IS NOT NULL
+          AND m.inventory_movement_type IN ('shipped', 'received')
+          AND COALESCE(c.competition_id, a.competition_id) IS NOT NULL
+        GROUP BY 1, 2
+        """
+    )
+    op.execute(
+        """
+        UPDATE competition_statistics
+        SET competition_statistics_is_stale = true
+        """
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_competition_trading_volume_id"), table_name="competition_trading_volume")
+    op.drop_table("competition_trading_volume")
@@ -0,0 +1,41 @@
+"""link trade items to the inventory they reserve
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "trade_items",
+        sa.Column("inventory_id", sa.Integer(), nullable=True),
+    )
+    op.create_foreign_key(
+        "trade_items_inventory_id_fkey",
+        "trade_items",
+        "company_inventory",
+        ["inventory_id"],
+        ["id"],
+    )
+    op.create_index(
+        "ix_trade_items_inventory_id",
+        "trade_items",
+        ["inventory_id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_trade_items_inventory_id", table_name="trade_items")
+    op.drop_constraint("trade_items_inventory_id_fkey", "trade_items", type_="foreignkey")
+    op.drop_column("trade_items", "inventory_id")
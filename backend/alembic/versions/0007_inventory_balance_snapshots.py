@@ -0,0 +1,66 @@
+"""inventory balance snapshots over the movement ledger
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "inventory_balance_snapshots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("inventory_id", sa.Integer(), nullable=False),
+        sa.Column("inventory_balance_snapshot_available", sa.Integer(), nullable=False),
+        sa.Column("inventory_balance_snapshot_allocated", sa.Integer(), nullable=False),
+        sa.Column("inventory_balance_snapshot_taken_at", sa.TIMESTAMP(), nullable=False),
+        sa.ForeignKeyConstraint(["inventory_id"], ["company_inventory.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_inventory_balance_snapshots_id"), "inventory_balance_snapshots", ["id"], unique=False
+    )
+    op.create_index(
+        "ix_inventory_balance_snapshots_inventory_taken_at",
+        "inventory_balance_snapshots",
+        ["inventory_id", "inventory_balance_snapshot_taken_at"],
+    )
+
+    # Existing counters were never fully recorded in the ledger, so anchor
+    # every item's balance at its current counters
+    op.execute(
+        """
+        INSERT INTO inventory_balance_snapshots (
+            inventory_id,
+            inventory_balance_snapshot_available,
+            inventory_balance_snapshot_allocated,
+            inventory_balance_snapshot_taken_at
+        )
+        SELECT id,
+               company_inventory_quantity_available,
+               company_inventory_quantity_allocated,
+               now()
+        FROM company_inventory
+        """
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_inventory_balance_snapshots_inventory_taken_at",
+        table_name="inventory_balance_snapshots",
+    )
+    op.drop_index(op.f("ix_inventory_balance_snapshots_id"), table_name="inventory_balance_snapshots")
+    op.drop_table("inventory_balance_snapshots")
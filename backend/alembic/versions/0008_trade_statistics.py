@@ -0,0 +1,143 @@
+"""pre-aggregated trade statistics
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "trade_status_counts",
+        *_timestamps(),
+        sa.Column("trade_status_counts_status", sa.String(), nullable=False),
+        sa.Column("trade_status_counts_count", sa.Integer(), nullable=False),
+        sa.Column("trade_status_counts_processing_seconds", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("trade_status_counts_status"),
+    )
+    op.create_index(
+        op.f("ix_trade_status_counts_id"), "trade_status_counts", ["id"], unique=False
+    )
+    op.create_table(
+        "trade_item_volume",
+        *_timestamps(),
+        sa.Column("trade_item_volume_date", sa.Date(), nullable=False),
+        sa.Column("trade_item_volume_item_type", sa.String(), nullable=False),
+        sa.Column("trade_item_volume_item_id", sa.Integer(), nullable=False),
+        sa.Column("trade_item_volume_quantity", sa.Integer(), nullable=False),
+        sa.Column("trade_item_volume_movements", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "trade_item_volume_date",
+            "trade_item_volume_item_type",
+            "trade_item_volume_item_id",
+            name="uq_trade_item_volume_day_item",
+        ),
+    )
+    op.create_index(
+        op.f("ix_trade_item_volume_id"), "trade_item_volume", ["id"], unique=False
+    )
+    op.create_table(
+        "inventory_movement_volume",
+        *_timestamps(),
+        sa.Column("inventory_movement_volume_date", sa.Date(), nullable=False),
+        sa.Column("inventory_movement_volume_type", sa.String(), nullable=False),
+        sa.Column("inventory_movement_volume_quantity", sa.Integer(), nullable=False),
+        sa.Column("inventory_movement_volume_movements", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "inventory_movement_volume_date",
+            "inventory_movement_volume_type",
+            name="uq_inventory_movement_volume_day_type",
+        ),
+    )
+    op.create_index(
+        op.f("ix_inventory_movement_volume_id"), "inventory_movement_volume", ["id"], unique=False
+    )
+
+    # Seed the counters from existing trade requests; completed trades
+    # approximate their processing time with the last update
+    op.execute(
+        """
+        INSERT INTO trade_status_counts (
+            trade_status_counts_status,
+            trade_status_counts_count,
+            trade_status_counts_processing_seconds
+        )
+        SELECT trade_requests_status,
+               COUNT(*),
+               CASE WHEN trade_requests_status = 'completed'
+                    THEN COALESCE(SUM(EXTRACT(EPOCH FROM (
+                        trade_requests_updated_at - trade_requests_created_at
+                    ))), 0)
+                    ELSE 0
+               END
+        FROM trade_requests
+        GROUP BY trade_requests_status
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO trade_item_volume (
+            trade_item_volume_date,
+            trade_item_volume_item_type,
+            trade_item_volume_item_id,
+            trade_item_volume_quantity,
+            trade_item_volume_movements
+        )
+        SELECT CAST(m.inventory_movement_created_at AS DATE),
+               ci.company_inventory_item_type,
+               ci.company_inventory_item_id,
+               SUM(m.inventory_movement_quantity),
+               COUNT(*)
+        FROM inventory_movement m
+        JOIN company_inventory ci ON ci.id = m.inventory_id
+        WHERE m.trade_request_id IS NOT NULL
+          AND m.inventory_movement_type IN ('shipped', 'received')
+        GROUP BY 1, 2, 3
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO inventory_movement_volume (
+            inventory_movement_volume_date,
+            inventory_movement_volume_type,
+            inventory_movement_volume_quantity,
+            inventory_movement_volume_movements
+        )
+        SELECT CAST(inventory_movement_created_at AS DATE),
+               inventory_movement_type,
+               SUM(inventory_movement_quantity),
+               COUNT(*)
+        FROM inventory_movement
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_inventory_movement_volume_id"), table_name="inventory_movement_volume")
+    op.drop_table("inventory_movement_volume")
+    op.drop_index(op.f("ix_trade_item_volume_id"), table_name="trade_item_volume")
+    op.drop_table("trade_item_volume")
+    op.drop_index(op.f("ix_trade_status_counts_id"), table_name="trade_status_counts")
+    op.drop_table("trade_status_counts")
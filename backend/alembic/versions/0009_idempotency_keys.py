@@ -0,0 +1,49 @@
+"""idempotency keys for retried writes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=255), nullable=False),
+        sa.Column("idempotency_key_scope", sa.String(), nullable=False),
+        sa.Column("idempotency_key_fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("idempotency_key_status_code", sa.Integer(), nullable=True),
+        sa.Column("idempotency_key_response", sa.JSON(), nullable=True),
+        sa.Column("idempotency_key_expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "idempotency_key",
+            "idempotency_key_scope",
+            name="uq_idempotency_keys_key_scope",
+        ),
+    )
+    op.create_index(
+        op.f("ix_idempotency_keys_id"), "idempotency_keys", ["id"], unique=False
+    )
+    op.create_index(
+        "ix_idempotency_keys_expires_at", "idempotency_keys", ["idempotency_key_expires_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_index(op.f("ix_idempotency_keys_id"), table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
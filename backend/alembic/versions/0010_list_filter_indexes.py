@@ -0,0 +1,88 @@
+"""indexes for foreign keys and list endpoint filters
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns); the collector_* item lists are already served by
+# the unique constraints leading with collector_id. Filters on low-cardinality
+# columns alone (card rarity, album language/publisher, pack container
+# type/language, box publisher, memorabilia type, competition year) are left
+# unindexed: each value matches a large share of the table, so a sequential
+# scan is cheaper, and combined with their parent id they are served by the
+# composites below.
+INDEXES = [
+    ("ix_albums_competition_id_edition", "albums", ["competition_id", "album_edition"]),
+    ("ix_albums_edition", "albums", ["album_edition"]),
+    ("ix_album_sections_album_id_order", "album_sections", ["album_id", "album_section_order"]),
+    ("ix_collector_albums_collector_id_completion", "collector_albums", ["collector_id", "collector_album_completion_percentage"]),
+    ("ix_collector_albums_album_id", "collector_albums", ["album_id"]),
+    ("ix_competitions_type_year", "competitions", ["competition_type", "competition_year"]),
+    ("ix_competitions_host_country", "competitions", ["competition_host_country"]),
+    ("ix_stickers_album_id_slot", "stickers", ["album_id", "sticker_slot", "id"]),
+    ("ix_collector_stickers_sticker_id", "collector_stickers", ["sticker_id"]),
+    ("ix_cards_competition_id_edition", "cards", ["competition_id", "card_edition"]),
+    ("ix_packs_album_id_edition", "packs", ["album_id", "pack_edition"]),
+    ("ix_boxes_album_id_edition", "boxes", ["album_id", "box_edition"]),
+    ("ix_memorabilia_album_id_type", "memorabilia", ["album_id", "memorabilia_type"]),
+    ("ix_company_inventory_item", "company_inventory", ["company_inventory_item_type", "company_inventory_item_id"]),
+    ("ix_company_inventory_quantity_available", "company_inventory", ["company_inventory_quantity_available"]),
+    ("ix_trade_requests_collector_id_status", "trade_requests", ["collector_id", "trade_requests_status"]),
+    ("ix_trade_requests_status", "trade_requests", ["trade_requests_status"]),
+    ("ix_trade_items_trade_request_id", "trade_items", ["trade_request_id"]),
+    ("ix_inventory_movement_inventory_id_created_at", "inventory_movement", ["inventory_id", "inventory_movement_created_at"]),
+    ("ix_inventory_movement_trade_request_id", "inventory_movement", ["trade_request_id"]),
+]
+
+# (name, table, column) for substring (ILIKE '%...%') filters, which need trigram GIN indexes
+TRIGRAM_INDEXES = [
+    ("ix_cards_player_name_trgm", "cards", "card_player_name"),
+    ("ix_cards_team_trgm", "cards", "card_team"),
+]
+
+# Superseded by ix_collector_albums_collector_id_completion: completion is only
+# ever filtered within one collector's albums
+REDUNDANT_INDEX = (
+    "ix_collector_albums_collector_album_completion_percentage",
+    "collector_albums",
+    ["collector_album_completion_percentage"],
+)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY cannot run inside a transaction, and avoids locking writes
+    # to the tables while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name, table, [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True
+            )
+        name, table, _ = REDUNDANT_INDEX
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        name, table, columns = REDUNDANT_INDEX
+        op.create_index(name, table, columns, postgresql_concurrently=True)
+        for name, table, _ in reversed(TRIGRAM_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,78 @@
+"""shard the trade statistics counters
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# (table, shard column, old unique constraint, key columns, new unique
+# constraint, summed columns); existing rows become shard 0
+COUNTERS = [
+    (
+        "trade_status_counts",
+        "trade_status_counts_shard",
+        "trade_status_counts_trade_status_counts_status_key",
+        ["trade_status_counts_status"],
+        "uq_trade_status_counts_status_shard",
+        ["trade_status_counts_count", "trade_status_counts_processing_seconds"],
+    ),
+    (
+        "trade_item_volume",
+        "trade_item_volume_shard",
+        "uq_trade_item_volume_day_item",
+        ["trade_item_volume_date", "trade_item_volume_item_type", "trade_item_volume_item_id"],
+        "uq_trade_item_volume_day_item_shard",
+        ["trade_item_volume_quantity", "trade_item_volume_movements"],
+    ),
+    (
+        "inventory_movement_volume",
+        "inventory_movement_volume_shard",
+        "uq_inventory_movement_volume_day_type",
+        ["inventory_movement_volume_date", "inventory_movement_volume_type"],
+        "uq_inventory_movement_volume_day_type_shard",
+        ["inventory_movement_volume_quantity", "inventory_movement_volume_movements"],
+    ),
+]
+
+
+def upgrade():
+    for table, shard, old_name, columns, new_name, _ in COUNTERS:
+        op.add_column(
+            table,
+            sa.Column(shard, sa.Integer(), server_default="0", nullable=False),
+        )
+        op.drop_constraint(old_name, table, type_="unique")
+        op.create_unique_constraint(new_name, table, columns + [shard])
+
+
+def downgrade():
+    for table, shard, old_name, columns, new_name, summed in reversed(COUNTERS):
+        # Fold each key's shards into its oldest row before dropping the shard
+        keys = ", ".join(columns)
+        op.execute(
+            f"""
+            UPDATE {table} SET {", ".join(f"{c} = folded.{c}" for c in summed)}
+            FROM (
+                SELECT MIN(id) AS id, {", ".join(f"SUM({c}) AS {c}" for c in summed)}
+                FROM {table}
+                GROUP BY {keys}
+            ) AS folded
+            WHERE {table}.id = folded.id
+            """
+        )
+        op.execute(
+            f"DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY {keys})"
+        )
+        op.drop_constraint(new_name, table, type_="unique")
+        op.drop_column(table, shard)
+        op.create_unique_constraint(old_name, table, columns)
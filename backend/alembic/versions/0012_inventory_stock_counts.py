@@ -0,0 +1,50 @@
+"""sharded counter of units held in inventory
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "inventory_stock_counts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("inventory_stock_counts_shard", sa.Integer(), nullable=False),
+        sa.Column("inventory_stock_counts_quantity", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("inventory_stock_counts_shard"),
+    )
+    op.create_index(
+        op.f("ix_inventory_stock_counts_id"), "inventory_stock_counts", ["id"], unique=False
+    )
+
+    # Seed shard 0 with the stock held today; movements add to random shards from here on
+    op.execute(
+        """
+        INSERT INTO inventory_stock_counts (
+            inventory_stock_counts_shard,
+            inventory_stock_counts_quantity
+        )
+        SELECT 0,
+               COALESCE(SUM(company_inventory_quantity_available + company_inventory_quantity_allocated), 0)
+        FROM company_inventory
+        """
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_inventory_stock_counts_id"), table_name="inventory_stock_counts")
+    op.drop_table("inventory_stock_counts")
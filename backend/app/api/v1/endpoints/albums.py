@@ -1,9 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 
 from ....db.session import get_db
 from ....models import Album, AlbumSection, CollectorAlbum, Competition
+from ....services.collection import recompute_album_completion
+from ....services.statistics import (
+    mark_competition_statistics_stale,
+    invalidate_collector_statistics
+)
+from ..pagination import Page, get_page
+from ..serialization import list_response
 from ..schemas.album import (
     AlbumCreate,
     AlbumUpdate,
@@ -15,18 +22,15 @@ from ..schemas.album import (
 
 router = APIRouter()
 
-@router.get("/", response_model=List[AlbumResponse])
-async def list_albums(
+def list_albums_query(
+    db: Session,
     competition_id: Optional[int] = None,
     edition: Optional[str] = None,
     language: Optional[str] = None,
-    publisher: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    publisher: Optional[str] = None
 ):
-    """List all albums with optional filters"""
-    query = db.query(Album)
+    """Query for list_albums before paging"""
+    query = db.query(Album).options(selectinload(Album.sections))
     
     if competition_id:
         query = query.filter(Album.competition_id == competition_id)
@@ -36,11 +40,24 @@ async def list_albums(
         query = query.filter(Album.album_language == language)
     if publisher:
         query = query.filter(Album.album_publisher == publisher)
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/", response_model=List[AlbumResponse])
+def list_albums(
+    competition_id: Optional[int] = None,
+    edition: Optional[str] = None,
+    language: Optional[str] = None,
+    publisher: Optional[str] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List all albums with optional filters"""
+    query = list_albums_query(db, competition_id, edition, language, publisher)
+    return list_response(page.apply(query, Album.id), AlbumResponse, page.response)
 
 @router.post("/", response_model=AlbumResponse)
-async def create_album(
+def create_album(
     album: AlbumCreate,
     db: Session = Depends(get_db)
 ):
@@ -54,12 +71,13 @@ async def create_album(
 
     db_album = Album(**album.dict())
     db.add(db_album)
+    mark_competition_statistics_stale(db, album.competition_id)
     db.commit()
     db.refresh(db_album)
     return db_album
 
 @router.get("/{album_id}", response_model=AlbumResponse)
-async def get_album(
+def get_album(
     album_id: int,
     db: Session = Depends(get_db)
 ):
@@ -70,7 +88,7 @@ async def get_album(
     return album
 
 @router.put("/{album_id}", response_model=AlbumResponse)
-async def update_album(
+def update_album(
     album_id: int,
     album_data: AlbumUpdate,
     db: Session = Depends(get_db)
@@ -82,13 +100,19 @@ async def update_album(
     
     for field, value in album_data.dict(exclude_unset=True).items():
         setattr(album, field, value)
-    
+
+    if album_data.album_total_stickers is not None:
+        recompute_album_completion(db, album.id, album.album_total_stickers)
+
+    mark_competition_statistics_stale(db, album.competition_id)
     db.commit()
+    if album_data.album_total_stickers is not None:
+        invalidate_collector_statistics()
     db.refresh(album)
     return album
 
 @router.post("/{album_id}/sections", response_model=AlbumSectionResponse)
-async def create_album_section(
+def create_album_section(
     album_id: int,
     section: AlbumSectionCreate,
     db: Session = Depends(get_db)
@@ -104,8 +128,14 @@ async def create_album_section(
     db.refresh(db_section)
     return db_section
 
+def list_album_sections_query(db: Session, album_id: int):
+    """Query for list_album_sections"""
+    return db.query(AlbumSection).filter(
+        AlbumSection.album_id == album_id
+    ).order_by(AlbumSection.album_section_order)
+
 @router.get("/{album_id}/sections", response_model=List[AlbumSectionResponse])
-async def list_album_sections(
+def list_album_sections(
     album_id: int,
     db: Session = Depends(get_db)
 ):
@@ -114,22 +144,52 @@ async def list_album_sections(
     if not album:
         raise HTTPException(status_code=404, detail="Album not found")
     
-    return db.query(AlbumSection).filter(
-        AlbumSection.album_id == album_id
-    ).order_by(AlbumSection.album_section_order).all()
+    return list_album_sections_query(db, album_id).all()
 
-@router.get("/collector/{collector_id}", response_model=List[CollectorAlbumResponse])
-async def list_collector_albums(
+def list_collector_albums_query(
+    db: Session,
     collector_id: int,
     completion_status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    min_completion: Optional[float] = None
 ):
-    """List all albums owned by a collector"""
-    query = db.query(CollectorAlbum).filter(
+    """Query for list_collector_albums before paging"""
+    query = db.query(CollectorAlbum).options(
+        selectinload(CollectorAlbum.album).selectinload(Album.sections)
+    ).filter(
         CollectorAlbum.collector_id == collector_id
     )
-    
-    if completion_status:
-        query = query.filter(CollectorAlbum.collector_album_completion == completion_status)
-    
-    return query.all()
+
+    completion = CollectorAlbum.collector_album_completion_percentage
+    if completion_status == "complete":
+        query = query.filter(completion >= 100)
+    elif completion_status == "in_progress":
+        query = query.filter(completion > 0, completion < 100)
+    elif completion_status == "not_started":
+        query = query.filter(completion == 0)
+    elif completion_status:
+        try:
+            percentage = float(completion_status.rstrip('%'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid completion status")
+        # Legacy completion strings hold the floored percentage, e.g. "33%" for 33.3
+        query = query.filter(completion >= percentage, completion < percentage + 1)
+    if min_completion is not None:
+        query = query.filter(completion >= min_completion)
+
+    return query
+
+@router.get("/collector/{collector_id}", response_model=List[CollectorAlbumResponse])
+def list_collector_albums(
+    collector_id: int,
+    completion_status: Optional[str] = None,
+    min_completion: Optional[float] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List all albums owned by a collector.
+
+    ``completion_status`` accepts ``complete``, ``in_progress``,
+    ``not_started`` or an exact percentage such as ``100%``.
+    """
+    query = list_collector_albums_query(db, collector_id, completion_status, min_completion)
+    return page.apply(query, CollectorAlbum.id)
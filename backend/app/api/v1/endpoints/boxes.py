@@ -4,6 +4,11 @@ from typing import List, Optional
 
 from ....db.session import get_db
 from ....models import Box, CollectorBox, Album
+from ....services.collection import upsert_collector_items
+from ....services.statistics import invalidate_collector_statistics
+from ..idempotency import Idempotency, get_idempotency
+from ..pagination import Page, get_page
+from ..serialization import list_response
 from ..schemas.box import (
     BoxCreate,
     BoxUpdate,
@@ -15,16 +20,13 @@ from ..schemas.box import (
 
 router = APIRouter()
 
-@router.get("/", response_model=List[BoxResponse])
-async def list_boxes(
+def list_boxes_query(
+    db: Session,
     album_id: Optional[int] = None,
     edition: Optional[str] = None,
-    publisher: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    publisher: Optional[str] = None
 ):
-    """List all boxes with optional filters"""
+    """Query for list_boxes before paging"""
     query = db.query(Box)
     
     if album_id:
@@ -33,11 +35,23 @@ async def list_boxes(
         query = query.filter(Box.box_edition == edition)
     if publisher:
         query = query.filter(Box.box_publisher == publisher)
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/", response_model=List[BoxResponse])
+def list_boxes(
+    album_id: Optional[int] = None,
+    edition: Optional[str] = None,
+    publisher: Optional[str] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List all boxes with optional filters"""
+    query = list_boxes_query(db, album_id, edition, publisher)
+    return list_response(page.apply(query, Box.id), BoxResponse, page.response)
 
 @router.post("/", response_model=BoxResponse)
-async def create_box(
+def create_box(
     box: BoxCreate,
     db: Session = Depends(get_db)
 ):
@@ -54,7 +68,7 @@ async def create_box(
     return db_box
 
 @router.get("/{box_id}", response_model=BoxResponse)
-async def get_box(
+def get_box(
     box_id: int,
     db: Session = Depends(get_db)
 ):
@@ -65,7 +79,7 @@ async def get_box(
     return box
 
 @router.put("/{box_id}", response_model=BoxResponse)
-async def update_box(
+def update_box(
     box_id: int,
     box_data: BoxUpdate,
     db: Session = Depends(get_db)
@@ -82,41 +96,65 @@ async def update_box(
     db.refresh(box)
     return box
 
-@router.get("/collector/{collector_id}", response_model=List[CollectorBoxResponse])
-async def list_collector_boxes(
+def list_collector_boxes_query(
+    db: Session,
     collector_id: int,
-    is_sealed: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    is_sealed: Optional[bool] = None
 ):
-    """List boxes owned by a collector"""
+    """Query for list_collector_boxes before paging"""
     query = db.query(CollectorBox).filter(
         CollectorBox.collector_id == collector_id
     )
     
     if is_sealed is not None:
         query = query.filter(CollectorBox.collector_box_is_sealed == is_sealed)
-    
-    return query.all()
+
+    return query
+
+@router.get("/collector/{collector_id}", response_model=List[CollectorBoxResponse])
+def list_collector_boxes(
+    collector_id: int,
+    is_sealed: Optional[bool] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List boxes owned by a collector"""
+    query = list_collector_boxes_query(db, collector_id, is_sealed)
+    return page.apply(query, CollectorBox.id)
 
 @router.post("/collector", response_model=CollectorBoxResponse)
-async def add_collector_box(
+def add_collector_box(
     box: CollectorBoxCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Idempotency = Depends(get_idempotency)
 ):
     """Add a box to collector's collection"""
+    replay = idempotency.replay(box)
+    if replay is not None:
+        return replay
+
     # Verify box exists
     db_box = db.query(Box).filter(Box.id == box.box_id).first()
     if not db_box:
         raise HTTPException(status_code=404, detail="Box not found")
 
-    db_collector_box = CollectorBox(**box.dict())
-    db.add(db_collector_box)
+    collector_box_id, = upsert_collector_items(
+        db,
+        CollectorBox,
+        [box.dict()],
+        ("collector_id", "box_id"),
+        "collector_box_quantity"
+    )
+    collector_box = db.query(CollectorBox).filter(
+        CollectorBox.id == collector_box_id
+    ).first()
+    response = idempotency.store(CollectorBoxResponse.from_orm(collector_box))
     db.commit()
-    db.refresh(db_collector_box)
-    return db_collector_box
+    invalidate_collector_statistics(box.collector_id)
+    return response
 
 @router.put("/collector/{collector_box_id}", response_model=CollectorBoxResponse)
-async def update_collector_box(
+def update_collector_box(
     collector_box_id: int,
     box_data: CollectorBoxUpdate,
     db: Session = Depends(get_db)
@@ -132,5 +170,6 @@ async def update_collector_box(
         setattr(collector_box, field, value)
     
     db.commit()
+    invalidate_collector_statistics(collector_box.collector_id)
     db.refresh(collector_box)
     return collector_box
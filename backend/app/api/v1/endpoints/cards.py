@@ -4,6 +4,14 @@ from typing import List, Optional
 
 from ....db.session import get_db
 from ....models import Card, CollectorCard, Competition
+from ....services.collection import upsert_collector_items
+from ....services.statistics import (
+    mark_competition_statistics_stale,
+    invalidate_collector_statistics
+)
+from ..idempotency import Idempotency, get_idempotency
+from ..pagination import Page, get_page
+from ..serialization import list_response
 from ..schemas.card import (
     CardCreate,
     CardUpdate,
@@ -15,18 +23,15 @@ from ..schemas.card import (
 
 router = APIRouter()
 
-@router.get("/", response_model=List[CardResponse])
-async def list_cards(
+def list_cards_query(
+    db: Session,
     competition_id: Optional[int] = None,
     edition: Optional[str] = None,
     rarity: Optional[int] = None,
     player: Optional[str] = None,
-    team: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    team: Optional[str] = None
 ):
-    """List all cards with optional filters"""
+    """Query for list_cards before paging"""
     query = db.query(Card)
     
     if competition_id:
@@ -39,11 +44,25 @@ async def list_cards(
         query = query.filter(Card.card_player_name.ilike(f"%{player}%"))
     if team:
         query = query.filter(Card.card_team.ilike(f"%{team}%"))
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/", response_model=List[CardResponse])
+def list_cards(
+    competition_id: Optional[int] = None,
+    edition: Optional[str] = None,
+    rarity: Optional[int] = None,
+    player: Optional[str] = None,
+    team: Optional[str] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List all cards with optional filters"""
+    query = list_cards_query(db, competition_id, edition, rarity, player, team)
+    return list_response(page.apply(query, Card.id), CardResponse, page.response)
 
 @router.post("/", response_model=CardResponse)
-async def create_card(
+def create_card(
     card: CardCreate,
     db: Session = Depends(get_db)
 ):
@@ -57,12 +76,13 @@ async def create_card(
 
     db_card = Card(**card.dict())
     db.add(db_card)
+    mark_competition_statistics_stale(db, card.competition_id)
     db.commit()
     db.refresh(db_card)
     return db_card
 
 @router.get("/{card_id}", response_model=CardResponse)
-async def get_card(
+def get_card(
     card_id: int,
     db: Session = Depends(get_db)
 ):
@@ -72,41 +92,67 @@ async def get_card(
         raise HTTPException(status_code=404, detail="Card not found")
     return card
 
-@router.get("/collector/{collector_id}", response_model=List[CollectorCardResponse])
-async def list_collector_cards(
+def list_collector_cards_query(
+    db: Session,
     collector_id: int,
-    is_duplicate: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    is_duplicate: Optional[bool] = None
 ):
-    """List cards owned by a collector"""
+    """Query for list_collector_cards before paging"""
     query = db.query(CollectorCard).filter(
         CollectorCard.collector_id == collector_id
     )
     
     if is_duplicate is not None:
         query = query.filter(CollectorCard.collector_card_is_duplicate == is_duplicate)
-    
-    return query.all()
+
+    return query
+
+@router.get("/collector/{collector_id}", response_model=List[CollectorCardResponse])
+def list_collector_cards(
+    collector_id: int,
+    is_duplicate: Optional[bool] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List cards owned by a collector"""
+    query = list_collector_cards_query(db, collector_id, is_duplicate)
+    return page.apply(query, CollectorCard.id)
 
 @router.post("/collector", response_model=CollectorCardResponse)
-async def add_collector_card(
+def add_collector_card(
     card: CollectorCardCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Idempotency = Depends(get_idempotency)
 ):
     """Add a card to collector's collection"""
+    replay = idempotency.replay(card)
+    if replay is not None:
+        return replay
+
     # Verify card exists
     db_card = db.query(Card).filter(Card.id == card.card_id).first()
     if not db_card:
         raise HTTPException(status_code=404, detail="Card not found")
 
-    db_collector_card = CollectorCard(**card.dict())
-    db.add(db_collector_card)
+    collector_card_id, = upsert_collector_items(
+        db,
+        CollectorCard,
+        [card.dict()],
+        ("collector_id", "card_id"),
+        "collector_card_quantity",
+        "collector_card_is_duplicate"
+    )
+    mark_competition_statistics_stale(db, db_card.competition_id)
+    collector_card = db.query(CollectorCard).filter(
+        CollectorCard.id == collector_card_id
+    ).first()
+    response = idempotency.store(CollectorCardResponse.from_orm(collector_card))
     db.commit()
-    db.refresh(db_collector_card)
-    return db_collector_card
+    invalidate_collector_statistics(card.collector_id)
+    return response
 
 @router.put("/collector/{collector_card_id}", response_model=CollectorCardResponse)
-async def update_collector_card(
+def update_collector_card(
     collector_card_id: int,
     card_data: CollectorCardUpdate,
     db: Session = Depends(get_db)
@@ -122,5 +168,6 @@ async def update_collector_card(
         setattr(collector_card, field, value)
     
     db.commit()
+    invalidate_collector_statistics(collector_card.collector_id)
     db.refresh(collector_card)
     return collector_card
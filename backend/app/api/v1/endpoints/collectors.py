@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
 
+from ....core.cache import cached
 from ....db.session import get_db
-from ....models import Collector, CollectorAlbum
+from ....models import Collector
+from ....services.export import csv_export, iter_collection, ndjson_export
+from ....services.statistics import COLLECTOR_STATISTICS_CACHE, collector_statistics
 from ..schemas.collector import (
     CollectorCreate,
     CollectorUpdate,
@@ -14,7 +18,7 @@ from ..schemas.collector import (
 router = APIRouter()
 
 @router.get("/{collector_id}", response_model=CollectorResponse)
-async def get_collector(
+def get_collector(
     collector_id: int,
     db: Session = Depends(get_db)
 ):
@@ -25,7 +29,7 @@ async def get_collector(
     return collector
 
 @router.put("/{collector_id}", response_model=CollectorResponse)
-async def update_collector(
+def update_collector(
     collector_id: int,
     collector_data: CollectorUpdate,
     db: Session = Depends(get_db)
@@ -43,27 +47,42 @@ async def update_collector(
     return collector
 
 @router.get("/{collector_id}/statistics", response_model=CollectorStatistics)
-async def get_collector_statistics(
+@cached(COLLECTOR_STATISTICS_CACHE, key=("collector_id",))
+def get_collector_statistics(
     collector_id: int,
     db: Session = Depends(get_db)
 ):
     """Get detailed collection statistics"""
-    collector = db.query(Collector).filter(Collector.id == collector_id).first()
-    if not collector:
+    statistics = collector_statistics(db, collector_id)
+    if statistics is None:
         raise HTTPException(status_code=404, detail="Collector not found")
+    return statistics
 
-    # Calculate statistics
-    total_albums = db.query(CollectorAlbum).filter(
-        CollectorAlbum.collector_id == collector_id
-    ).count()
+# Encoder and media type for each collection export format
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_export, "application/x-ndjson"),
+    "csv": (csv_export, "text/csv"),
+}
+
+@router.get("/{collector_id}/export")
+def export_collection(
+    collector_id: int,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    db: Session = Depends(get_db)
+):
+    """Stream a collector's whole collection as NDJSON or CSV"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
 
-    completed_albums = db.query(CollectorAlbum).filter(
-        CollectorAlbum.collector_id == collector_id,
-        CollectorAlbum.collector_album_completion == "100%"
-    ).count()
+    collector = db.query(Collector.id).filter(Collector.id == collector_id).first()
+    if not collector:
+        raise HTTPException(status_code=404, detail="Collector not found")
 
-    return {
-        "total_albums": total_albums,
-        "completed_albums": completed_albums,
-        "completion_rate": (completed_albums / total_albums * 100) if total_albums > 0 else 0
-    }
+    encode, media_type = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        encode(iter_collection(db, collector_id)),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="collector-{collector_id}.{format}"'
+        }
+    )
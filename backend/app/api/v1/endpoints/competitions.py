@@ -1,30 +1,74 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
+from datetime import date
 
+from ....core.config import settings
+from ....db.dependents import find_dependents, plan_cascade_delete
 from ....db.session import get_db
-from ....models import Competition, Album, Card, CollectorAlbum, CollectorCard
+from ....models import Competition, CompetitionStatistics, Album, Card, Memorabilia
+from ....models import statistics as statistics_models
+from ....core.cache import cached
+from ....services.statistics import (
+    COMPETITION_TRADING_VOLUME_CACHE,
+    competition_statistics_snapshot,
+    snapshot_age_seconds,
+    get_trading_volume
+)
+from ..pagination import Page, encode_cursor, get_page
+from ..serialization import list_response
 from ..schemas.competition import (
     CompetitionCreate,
     CompetitionUpdate,
     CompetitionResponse,
     CompetitionStats,
+    CompetitionTradingVolume,
     CompetitionWithItems
 )
 
 router = APIRouter()
 
-@router.get("/", response_model=List[CompetitionResponse])
-async def list_competitions(
+# Rollups derived from a competition, removed along with it
+COMPETITION_DERIVED_MODELS = (
+    CompetitionStatistics,
+    statistics_models.CompetitionTradingVolume
+)
+
+# Summary columns, ordering, filters and list endpoint for each item list of a competition
+COMPETITION_ITEM_QUERIES = {
+    "albums": (
+        (Album.id, Album.album_title, Album.album_edition, Album.album_language,
+         Album.album_publisher, Album.album_total_stickers, Album.album_release_year),
+        Album.id,
+        lambda competition_id: [Album.competition_id == competition_id],
+        "/albums/"
+    ),
+    "cards": (
+        (Card.id, Card.card_number, Card.card_player_name, Card.card_team,
+         Card.card_edition, Card.card_rarity_level),
+        Card.id,
+        lambda competition_id: [Card.competition_id == competition_id],
+        "/cards/"
+    ),
+    "memorabilia": (
+        (Memorabilia.id, Memorabilia.album_id, Memorabilia.memorabilia_type,
+         Memorabilia.memorabilia_special_features),
+        Memorabilia.id,
+        lambda competition_id: [
+            Memorabilia.album_id == Album.id,
+            Album.competition_id == competition_id
+        ],
+        "/memorabilia/"
+    ),
+}
+
+def list_competitions_query(
+    db: Session,
     competition_type: Optional[str] = None,
     year: Optional[int] = None,
-    host_country: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    host_country: Optional[str] = None
 ):
-    """List all competitions with optional filters"""
+    """Query for list_competitions before paging"""
     query = db.query(Competition)
     
     if competition_type:
@@ -33,11 +77,23 @@ async def list_competitions(
         query = query.filter(Competition.competition_year == year)
     if host_country:
         query = query.filter(Competition.competition_host_country == host_country)
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/", response_model=List[CompetitionResponse])
+def list_competitions(
+    competition_type: Optional[str] = None,
+    year: Optional[int] = None,
+    host_country: Optional[str] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List all competitions with optional filters"""
+    query = list_competitions_query(db, competition_type, year, host_country)
+    return list_response(page.apply(query, Competition.id), CompetitionResponse, page.response)
 
 @router.post("/", response_model=CompetitionResponse)
-async def create_competition(
+def create_competition(
     competition: CompetitionCreate,
     db: Session = Depends(get_db)
 ):
@@ -49,20 +105,53 @@ async def create_competition(
     return db_competition
 
 @router.get("/{competition_id}", response_model=CompetitionWithItems)
-async def get_competition(
+def get_competition(
     competition_id: int,
+    include: str = "albums,cards,memorabilia",
+    items_limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db)
 ):
-    """Get competition details with associated items"""
+    """Get competition details with associated items.
+
+    ``include`` selects which item lists to return. Each list holds at most
+    ``items_limit`` summaries; when more exist ``links`` points at the list
+    endpoint serving the next page, starting after the last summary returned.
+    """
+    sections = {section.strip() for section in include.split(",") if section.strip()}
+    unknown = sections - set(COMPETITION_ITEM_QUERIES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}"
+        )
+
     competition = db.query(Competition).filter(
         Competition.id == competition_id
     ).first()
     if not competition:
         raise HTTPException(status_code=404, detail="Competition not found")
-    return competition
+
+    response = CompetitionResponse.from_orm(competition).dict()
+    response["links"] = {}
+    for section in sections:
+        columns, order_by, filter_for, list_path = COMPETITION_ITEM_QUERIES[section]
+        query = db.query(*columns)
+        for criterion in filter_for(competition_id):
+            query = query.filter(criterion)
+        items = query.order_by(order_by).limit(items_limit + 1).all()
+
+        if len(items) > items_limit:
+            items = items[:items_limit]
+            response["links"][section] = (
+                f"{settings.API_V1_STR}{list_path}?competition_id={competition_id}"
+                f"&cursor={encode_cursor([items[-1].id])}&limit={items_limit}"
+            )
+        response[section] = items
+
+    return response
 
 @router.put("/{competition_id}", response_model=CompetitionResponse)
-async def update_competition(
+def update_competition(
     competition_id: int,
     competition_data: CompetitionUpdate,
     db: Session = Depends(get_db)
@@ -82,7 +171,7 @@ async def update_competition(
     return competition
 
 @router.delete("/{competition_id}")
-async def delete_competition(
+def delete_competition(
     competition_id: int,
     db: Session = Depends(get_db)
 ):
@@ -94,113 +183,90 @@ async def delete_competition(
         raise HTTPException(status_code=404, detail="Competition not found")
 
     # Check if competition has any associated items
-    if competition.albums or competition.cards:
+    dependents = find_dependents(
+        db,
+        Competition,
+        competition_id,
+        ignore=COMPETITION_DERIVED_MODELS
+    )
+    if dependents:
         raise HTTPException(
             status_code=400,
-            detail="Cannot delete competition with associated items"
+            detail=f"Cannot delete competition with associated items: {', '.join(dependents)}"
         )
 
+    for model in COMPETITION_DERIVED_MODELS:
+        db.query(model).filter(
+            model.competition_id == competition_id
+        ).delete(synchronize_session=False)
     db.delete(competition)
     db.commit()
     return {"message": "Competition deleted successfully"}
 
+@router.get("/{competition_id}/delete-plan")
+def get_competition_delete_plan(
+    competition_id: int,
+    db: Session = Depends(get_db)
+):
+    """Count what a cascading delete of the competition would remove"""
+    competition = db.query(Competition.id).filter(
+        Competition.id == competition_id
+    ).first()
+    if not competition:
+        raise HTTPException(status_code=404, detail="Competition not found")
+
+    return {
+        "competition_id": competition_id,
+        "would_remove": plan_cascade_delete(db, Competition, competition_id)
+    }
+
 @router.get("/{competition_id}/stats", response_model=CompetitionStats)
-async def get_competition_stats(
+def get_competition_stats(
     competition_id: int,
     db: Session = Depends(get_db)
 ):
-    """Get statistics for a competition"""
+    """Get statistics for a competition from its rollup snapshot"""
+    # Checked outside the cached snapshot so unknown ids are never cached
+    if not db.query(Competition.id).filter(Competition.id == competition_id).first():
+        raise HTTPException(status_code=404, detail="Competition not found")
+
+    snapshot = competition_statistics_snapshot(db, competition_id)
+
+    return {
+        **snapshot,
+        "snapshot_age_seconds": snapshot_age_seconds(snapshot["refreshed_at"])
+    }
+
+@router.get("/{competition_id}/trading-volume", response_model=CompetitionTradingVolume)
+@cached(COMPETITION_TRADING_VOLUME_CACHE, key=("competition_id", "from_date", "to_date"))
+def get_competition_trading_volume(
+    competition_id: int,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db)
+):
+    """Get daily trading volume for a competition over a date range"""
     competition = db.query(Competition).filter(
         Competition.id == competition_id
     ).first()
     if not competition:
         raise HTTPException(status_code=404, detail="Competition not found")
 
-    # Calculate statistics
-    total_albums = db.query(Album).filter(
-        Album.competition_id == competition_id
-    ).count()
-
-    total_cards = db.query(Card).filter(
-        Card.competition_id == competition_id
-    ).count()
-
-    # Get collector counts
-    total_collectors = db.query(CollectorAlbum).join(Album).filter(
-        Album.competition_id == competition_id
-    ).distinct(CollectorAlbum.collector_id).count()
-
-    # Calculate completion rate
-    completed_albums = db.query(CollectorAlbum).join(Album).filter(
-        Album.competition_id == competition_id,
-        CollectorAlbum.collector_album_completion == "100%"
-    ).count()
-
-    completion_rate = (completed_albums / total_collectors) if total_collectors > 0 else 0
-
-    # Get most collected albums
-    most_collected = db.query(
-        Album,
-        func.count(CollectorAlbum.id).label('collectors')
-    ).join(CollectorAlbum).filter(
-        Album.competition_id == competition_id
-    ).group_by(Album.id).order_by(
-        func.count(CollectorAlbum.id).desc()
-    ).limit(5).all()
-
-    most_collected_albums = [
+    buckets = get_trading_volume(db, competition_id, from_date, to_date)
+    daily = [
         {
-            "id": album.id,
-            "name": album.album_title,
-            "collectors": collectors
+            "day": bucket.competition_trading_volume_date,
+            "quantity": bucket.competition_trading_volume_quantity,
+            "movements": bucket.competition_trading_volume_movements
         }
-        for album, collectors in most_collected
+        for bucket in buckets
     ]
 
-    # Get most collected cards
-    most_collected_cards_query = db.query(
-        Card,
-        func.count(CollectorCard.id).label('collectors')
-    ).join(CollectorCard).filter(
-        Card.competition_id == competition_id
-    ).group_by(Card.id).order_by(
-        func.count(CollectorCard.id).desc()
-    ).limit(5)
-
-    most_collected_cards = [
-        {
-            "id": card.id,
-            "name": card.card_player_name,
-            "collectors": collectors
-        }
-        for card, collectors in most_collected_cards_query.all()
-    ]
-
-    # Calculate average collection completion
-    completion_percentages = db.query(
-        CollectorAlbum.collector_album_completion
-    ).join(Album).filter(
-        Album.competition_id == competition_id
-    ).all()
-
-    total_completion = sum(
-        float(completion[0].rstrip('%'))
-        for completion in completion_percentages
-        if completion[0]
-    )
-    avg_completion = (
-        total_completion / len(completion_percentages)
-        if completion_percentages
-        else 0
-    )
-
     return {
-        "total_albums": total_albums,
-        "total_cards": total_cards,
-        "total_collectors": total_collectors,
-        "completion_rate": completion_rate,
-        "most_collected_albums": most_collected_albums,
-        "most_collected_cards": most_collected_cards,
-        "trading_volume": 0,  # To be implemented with trading system
-        "average_collection_completion": avg_completion
+        "competition_id": competition_id,
+        "from_date": from_date,
+        "to_date": to_date,
+        "total_quantity": sum(bucket["quantity"] for bucket in daily),
+        "total_movements": sum(bucket["movements"] for bucket in daily),
+        "daily": daily
     }
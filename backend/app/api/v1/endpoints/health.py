@@ -1,5 +1,9 @@
 from fastapi import APIRouter
 
+from ....core.cache import cache
+from ....db.metrics import pool_status
+from ....db.session import engine, read_engine
+
 router = APIRouter()
 
 @router.get("/health")
@@ -9,3 +13,14 @@ async def health_check():
         "service": "StickerMania API",
         "version": "1.0.0"
     }
+
+@router.get("/health/cache")
+async def cache_stats():
+    return cache.stats()
+
+@router.get("/health/db-pool")
+def db_pool_stats():
+    pools = {"primary": pool_status(engine)}
+    if read_engine is not engine:
+        pools["replica"] = pool_status(read_engine)
+    return pools
@@ -4,6 +4,11 @@ from typing import List, Optional
 
 from ....db.session import get_db
 from ....models import Memorabilia, CollectorMemorabilia, Album
+from ....services.collection import upsert_collector_items
+from ....services.statistics import invalidate_collector_statistics
+from ..idempotency import Idempotency, get_idempotency
+from ..pagination import Page, get_page
+from ..serialization import list_response
 from ..schemas.memorabilia import (
     MemorabiliaCreate,
     MemorabiliaUpdate,
@@ -15,26 +20,40 @@ from ..schemas.memorabilia import (
 
 router = APIRouter()
 
-@router.get("/", response_model=List[MemorabiliaResponse])
-async def list_memorabilia(
+def list_memorabilia_query(
+    db: Session,
     album_id: Optional[int] = None,
-    memorabilia_type: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    competition_id: Optional[int] = None,
+    memorabilia_type: Optional[str] = None
 ):
-    """List all memorabilia items with optional filters"""
+    """Query for list_memorabilia before paging"""
     query = db.query(Memorabilia)
     
     if album_id:
         query = query.filter(Memorabilia.album_id == album_id)
+    if competition_id:
+        query = query.join(Album, Memorabilia.album_id == Album.id).filter(
+            Album.competition_id == competition_id
+        )
     if memorabilia_type:
         query = query.filter(Memorabilia.memorabilia_type == memorabilia_type)
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/", response_model=List[MemorabiliaResponse])
+def list_memorabilia(
+    album_id: Optional[int] = None,
+    competition_id: Optional[int] = None,
+    memorabilia_type: Optional[str] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List all memorabilia items with optional filters"""
+    query = list_memorabilia_query(db, album_id, competition_id, memorabilia_type)
+    return list_response(page.apply(query, Memorabilia.id), MemorabiliaResponse, page.response)
 
 @router.post("/", response_model=MemorabiliaResponse)
-async def create_memorabilia(
+def create_memorabilia(
     memorabilia: MemorabiliaCreate,
     db: Session = Depends(get_db)
 ):
@@ -51,7 +70,7 @@ async def create_memorabilia(
     return db_memorabilia
 
 @router.get("/{memorabilia_id}", response_model=MemorabiliaResponse)
-async def get_memorabilia(
+def get_memorabilia(
     memorabilia_id: int,
     db: Session = Depends(get_db)
 ):
@@ -62,7 +81,7 @@ async def get_memorabilia(
     return memorabilia
 
 @router.put("/{memorabilia_id}", response_model=MemorabiliaResponse)
-async def update_memorabilia(
+def update_memorabilia(
     memorabilia_id: int,
     memorabilia_data: MemorabiliaUpdate,
     db: Session = Depends(get_db)
@@ -79,14 +98,13 @@ async def update_memorabilia(
     db.refresh(memorabilia)
     return memorabilia
 
-@router.get("/collector/{collector_id}", response_model=List[CollectorMemorabiliaResponse])
-async def list_collector_memorabilia(
+def list_collector_memorabilia_query(
+    db: Session,
     collector_id: int,
     memorabilia_type: Optional[str] = None,
-    is_sealed: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    is_sealed: Optional[bool] = None
 ):
-    """List memorabilia items owned by a collector"""
+    """Query for list_collector_memorabilia before paging"""
     query = db.query(CollectorMemorabilia).filter(
         CollectorMemorabilia.collector_id == collector_id
     )
@@ -99,15 +117,32 @@ async def list_collector_memorabilia(
         query = query.filter(
             CollectorMemorabilia.collector_memorabilia_is_sealed == is_sealed
         )
-    
-    return query.all()
+
+    return query
+
+@router.get("/collector/{collector_id}", response_model=List[CollectorMemorabiliaResponse])
+def list_collector_memorabilia(
+    collector_id: int,
+    memorabilia_type: Optional[str] = None,
+    is_sealed: Optional[bool] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List memorabilia items owned by a collector"""
+    query = list_collector_memorabilia_query(db, collector_id, memorabilia_type, is_sealed)
+    return page.apply(query, CollectorMemorabilia.id)
 
 @router.post("/collector", response_model=CollectorMemorabiliaResponse)
-async def add_collector_memorabilia(
+def add_collector_memorabilia(
     memorabilia: CollectorMemorabiliaCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Idempotency = Depends(get_idempotency)
 ):
     """Add a memorabilia item to collector's collection"""
+    replay = idempotency.replay(memorabilia)
+    if replay is not None:
+        return replay
+
     # Verify memorabilia exists
     db_memorabilia = db.query(Memorabilia).filter(
         Memorabilia.id == memorabilia.memorabilia_id
@@ -115,14 +150,23 @@ async def add_collector_memorabilia(
     if not db_memorabilia:
         raise HTTPException(status_code=404, detail="Memorabilia not found")
 
-    db_collector_memorabilia = CollectorMemorabilia(**memorabilia.dict())
-    db.add(db_collector_memorabilia)
+    collector_memorabilia_id, = upsert_collector_items(
+        db,
+        CollectorMemorabilia,
+        [memorabilia.dict()],
+        ("collector_id", "memorabilia_id"),
+        "collector_memorabilia_quantity"
+    )
+    collector_memorabilia = db.query(CollectorMemorabilia).filter(
+        CollectorMemorabilia.id == collector_memorabilia_id
+    ).first()
+    response = idempotency.store(CollectorMemorabiliaResponse.from_orm(collector_memorabilia))
     db.commit()
-    db.refresh(db_collector_memorabilia)
-    return db_collector_memorabilia
+    invalidate_collector_statistics(memorabilia.collector_id)
+    return response
 
 @router.put("/collector/{collector_memorabilia_id}", response_model=CollectorMemorabiliaResponse)
-async def update_collector_memorabilia(
+def update_collector_memorabilia(
     collector_memorabilia_id: int,
     memorabilia_data: CollectorMemorabiliaUpdate,
     db: Session = Depends(get_db)
@@ -138,5 +182,6 @@ async def update_collector_memorabilia(
         setattr(collector_memorabilia, field, value)
     
     db.commit()
+    invalidate_collector_statistics(collector_memorabilia.collector_id)
     db.refresh(collector_memorabilia)
     return collector_memorabilia
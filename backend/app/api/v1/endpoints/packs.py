@@ -4,6 +4,11 @@ from typing import List, Optional
 
 from ....db.session import get_db
 from ....models import Pack, CollectorPack, Album
+from ....services.collection import upsert_collector_items
+from ....services.statistics import invalidate_collector_statistics
+from ..idempotency import Idempotency, get_idempotency
+from ..pagination import Page, get_page
+from ..serialization import list_response
 from ..schemas.pack import (
     PackCreate,
     PackUpdate,
@@ -15,17 +20,14 @@ from ..schemas.pack import (
 
 router = APIRouter()
 
-@router.get("/", response_model=List[PackResponse])
-async def list_packs(
+def list_packs_query(
+    db: Session,
     album_id: Optional[int] = None,
     container_type: Optional[str] = None,
     edition: Optional[str] = None,
-    language: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    language: Optional[str] = None
 ):
-    """List all packs with optional filters"""
+    """Query for list_packs before paging"""
     query = db.query(Pack)
     
     if album_id:
@@ -36,11 +38,24 @@ async def list_packs(
         query = query.filter(Pack.pack_edition == edition)
     if language:
         query = query.filter(Pack.language == language)
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/", response_model=List[PackResponse])
+def list_packs(
+    album_id: Optional[int] = None,
+    container_type: Optional[str] = None,
+    edition: Optional[str] = None,
+    language: Optional[str] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List all packs with optional filters"""
+    query = list_packs_query(db, album_id, container_type, edition, language)
+    return list_response(page.apply(query, Pack.id), PackResponse, page.response)
 
 @router.post("/", response_model=PackResponse)
-async def create_pack(
+def create_pack(
     pack: PackCreate,
     db: Session = Depends(get_db)
 ):
@@ -57,7 +72,7 @@ async def create_pack(
     return db_pack
 
 @router.get("/{pack_id}", response_model=PackResponse)
-async def get_pack(
+def get_pack(
     pack_id: int,
     db: Session = Depends(get_db)
 ):
@@ -68,7 +83,7 @@ async def get_pack(
     return pack
 
 @router.put("/{pack_id}", response_model=PackResponse)
-async def update_pack(
+def update_pack(
     pack_id: int,
     pack_data: PackUpdate,
     db: Session = Depends(get_db)
@@ -85,41 +100,65 @@ async def update_pack(
     db.refresh(pack)
     return pack
 
-@router.get("/collector/{collector_id}", response_model=List[CollectorPackResponse])
-async def list_collector_packs(
+def list_collector_packs_query(
+    db: Session,
     collector_id: int,
-    is_sealed: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    is_sealed: Optional[bool] = None
 ):
-    """List packs owned by a collector"""
+    """Query for list_collector_packs before paging"""
     query = db.query(CollectorPack).filter(
         CollectorPack.collector_id == collector_id
     )
     
     if is_sealed is not None:
         query = query.filter(CollectorPack.collector_pack_is_sealed == is_sealed)
-    
-    return query.all()
+
+    return query
+
+@router.get("/collector/{collector_id}", response_model=List[CollectorPackResponse])
+def list_collector_packs(
+    collector_id: int,
+    is_sealed: Optional[bool] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List packs owned by a collector"""
+    query = list_collector_packs_query(db, collector_id, is_sealed)
+    return page.apply(query, CollectorPack.id)
 
 @router.post("/collector", response_model=CollectorPackResponse)
-async def add_collector_pack(
+def add_collector_pack(
     pack: CollectorPackCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Idempotency = Depends(get_idempotency)
 ):
     """Add a pack to collector's collection"""
+    replay = idempotency.replay(pack)
+    if replay is not None:
+        return replay
+
     # Verify pack exists
     db_pack = db.query(Pack).filter(Pack.id == pack.pack_id).first()
     if not db_pack:
         raise HTTPException(status_code=404, detail="Pack not found")
 
-    db_collector_pack = CollectorPack(**pack.dict())
-    db.add(db_collector_pack)
+    collector_pack_id, = upsert_collector_items(
+        db,
+        CollectorPack,
+        [pack.dict()],
+        ("collector_id", "pack_id"),
+        "collector_pack_quantity"
+    )
+    collector_pack = db.query(CollectorPack).filter(
+        CollectorPack.id == collector_pack_id
+    ).first()
+    response = idempotency.store(CollectorPackResponse.from_orm(collector_pack))
     db.commit()
-    db.refresh(db_collector_pack)
-    return db_collector_pack
+    invalidate_collector_statistics(pack.collector_id)
+    return response
 
 @router.put("/collector/{collector_pack_id}", response_model=CollectorPackResponse)
-async def update_collector_pack(
+def update_collector_pack(
     collector_pack_id: int,
     pack_data: CollectorPackUpdate,
     db: Session = Depends(get_db)
@@ -135,5 +174,6 @@ async def update_collector_pack(
         setattr(collector_pack, field, value)
     
     db.commit()
+    invalidate_collector_statistics(collector_pack.collector_id)
     db.refresh(collector_pack)
     return collector_pack
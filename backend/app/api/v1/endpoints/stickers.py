@@ -1,63 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from ....core.bitmap import count_bits, iter_bits
 from ....db.session import get_db
 from ....models import Sticker, CollectorSticker, Album, CollectorAlbum
+from ....services.collection import (
+    next_sticker_slot,
+    upsert_collector_items,
+    lock_collector_album,
+    set_sticker_owned,
+    sync_sticker_ownership,
+    bulk_add_collector_stickers,
+    update_album_completion
+)
+from ....services.statistics import (
+    mark_competition_statistics_stale,
+    invalidate_collector_statistics
+)
+from ..idempotency import Idempotency, get_idempotency
+from ..pagination import Page, get_page
+from ..serialization import list_response
 from ..schemas.sticker import (
     StickerCreate,
     StickerUpdate,
     StickerResponse,
     CollectorStickerCreate,
     CollectorStickerUpdate,
-    CollectorStickerResponse
+    CollectorStickerResponse,
+    CollectorStickerBulkCreate,
+    CollectorStickerBulkResult,
+    CollectorAlbumOwnership
 )
 
 router = APIRouter()
 
-@router.get("/album/{album_id}", response_model=List[StickerResponse])
-async def list_album_stickers(
+def list_album_stickers_query(
+    db: Session,
     album_id: int,
     edition: Optional[str] = None,
-    rarity: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    rarity: Optional[int] = None
 ):
-    """List all stickers in an album"""
+    """Query for list_album_stickers before paging"""
     query = db.query(Sticker).filter(Sticker.album_id == album_id)
     
     if edition:
         query = query.filter(Sticker.sticker_edition == edition)
     if rarity:
         query = query.filter(Sticker.sticker_rarity_level == rarity)
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/album/{album_id}", response_model=List[StickerResponse])
+def list_album_stickers(
+    album_id: int,
+    edition: Optional[str] = None,
+    rarity: Optional[int] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List all stickers in an album, in album order"""
+    query = list_album_stickers_query(db, album_id, edition, rarity)
+    stickers = page.apply(query, Sticker.sticker_slot, Sticker.id)
+    return list_response(stickers, StickerResponse, page.response)
 
 @router.post("/", response_model=StickerResponse)
-async def create_sticker(
+def create_sticker(
     sticker: StickerCreate,
     db: Session = Depends(get_db)
 ):
     """Create a new sticker"""
-    # Verify album exists
-    album = db.query(Album).filter(Album.id == sticker.album_id).first()
+    # Verify album exists, locking it while the sticker's slot is assigned
+    album = db.query(Album).filter(
+        Album.id == sticker.album_id
+    ).with_for_update().first()
     if not album:
         raise HTTPException(status_code=404, detail="Album not found")
 
-    db_sticker = Sticker(**sticker.dict())
+    db_sticker = Sticker(
+        **sticker.dict(),
+        sticker_slot=next_sticker_slot(db, sticker.album_id)
+    )
     db.add(db_sticker)
     db.commit()
     db.refresh(db_sticker)
     return db_sticker
 
-@router.get("/collector/{collector_album_id}", response_model=List[CollectorStickerResponse])
-async def list_collector_stickers(
+def list_collector_stickers_query(
+    db: Session,
     collector_album_id: int,
-    is_duplicate: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    is_duplicate: Optional[bool] = None
 ):
-    """List stickers owned by a collector for a specific album"""
+    """Query for list_collector_stickers before paging"""
     # Verify collector album exists
     collector_album = db.query(CollectorAlbum).filter(
         CollectorAlbum.id == collector_album_id
@@ -71,35 +105,94 @@ async def list_collector_stickers(
     
     if is_duplicate is not None:
         query = query.filter(CollectorSticker.collector_stickers_is_duplicate == is_duplicate)
-    
-    return query.all()
+
+    return query
+
+@router.get("/collector/{collector_album_id}", response_model=List[CollectorStickerResponse])
+def list_collector_stickers(
+    collector_album_id: int,
+    is_duplicate: Optional[bool] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List stickers owned by a collector for a specific album"""
+    query = list_collector_stickers_query(db, collector_album_id, is_duplicate)
+    return page.apply(query, CollectorSticker.id)
 
 @router.post("/collector", response_model=CollectorStickerResponse)
-async def add_collector_sticker(
+def add_collector_sticker(
     sticker: CollectorStickerCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Idempotency = Depends(get_idempotency)
 ):
     """Add a sticker to collector's album"""
+    replay = idempotency.replay(sticker)
+    if replay is not None:
+        return replay
+
     # Verify collector album exists
-    collector_album = db.query(CollectorAlbum).filter(
-        CollectorAlbum.id == sticker.collector_album_id
-    ).first()
+    collector_album = lock_collector_album(db, sticker.collector_album_id)
     if not collector_album:
         raise HTTPException(status_code=404, detail="Collector album not found")
 
     # Verify sticker exists
-    db_sticker = db.query(Sticker).filter(Sticker.id == sticker.sticker_id).first()
+    db_sticker = db.query(Sticker).filter(
+        Sticker.id == sticker.sticker_id,
+        Sticker.album_id == collector_album.album_id
+    ).first()
     if not db_sticker:
         raise HTTPException(status_code=404, detail="Sticker not found")
 
-    db_collector_sticker = CollectorSticker(**sticker.dict())
-    db.add(db_collector_sticker)
+    collector_sticker_id, = upsert_collector_items(
+        db,
+        CollectorSticker,
+        [sticker.dict()],
+        ("collector_album_id", "sticker_id"),
+        "collector_stickers_quantity",
+        "collector_stickers_is_duplicate"
+    )
+    if sticker.collector_stickers_quantity > 0:
+        set_sticker_owned(collector_album, db_sticker, True)
+    update_album_completion(collector_album, sticker.collector_stickers_quantity)
+    mark_competition_statistics_stale(db, collector_album.album.competition_id)
+    collector_sticker = db.query(CollectorSticker).filter(
+        CollectorSticker.id == collector_sticker_id
+    ).first()
+    response = idempotency.store(CollectorStickerResponse.from_orm(collector_sticker))
     db.commit()
-    db.refresh(db_collector_sticker)
-    return db_collector_sticker
+    invalidate_collector_statistics(collector_album.collector_id)
+    return response
+
+@router.post("/collector/bulk", response_model=CollectorStickerBulkResult)
+def add_collector_stickers_bulk(
+    batch: CollectorStickerBulkCreate,
+    db: Session = Depends(get_db),
+    idempotency: Idempotency = Depends(get_idempotency)
+):
+    """Add a batch of stickers, by number or id, to collector's album"""
+    replay = idempotency.replay(batch)
+    if replay is not None:
+        return replay
+
+    collector_album = lock_collector_album(db, batch.collector_album_id)
+    if not collector_album:
+        raise HTTPException(status_code=404, detail="Collector album not found")
+
+    result = bulk_add_collector_stickers(
+        db,
+        collector_album,
+        batch.sticker_numbers,
+        batch.sticker_ids,
+        batch.collector_stickers_condition
+    )
+    mark_competition_statistics_stale(db, collector_album.album.competition_id)
+    idempotency.store(result)
+    db.commit()
+    invalidate_collector_statistics(collector_album.collector_id)
+    return result
 
 @router.put("/collector/{collector_sticker_id}", response_model=CollectorStickerResponse)
-async def update_collector_sticker(
+def update_collector_sticker(
     collector_sticker_id: int,
     sticker_data: CollectorStickerUpdate,
     db: Session = Depends(get_db)
@@ -111,36 +204,157 @@ async def update_collector_sticker(
     if not collector_sticker:
         raise HTTPException(status_code=404, detail="Collector sticker not found")
 
+    collector_album = lock_collector_album(db, collector_sticker.collector_album_id)
+    db.refresh(collector_sticker)
+    previous_quantity = collector_sticker.collector_stickers_quantity
+
     for field, value in sticker_data.dict(exclude_unset=True).items():
         setattr(collector_sticker, field, value)
-    
+
+    db.flush()
+    sync_sticker_ownership(db, collector_album, collector_sticker.sticker)
+    update_album_completion(
+        collector_album,
+        collector_sticker.collector_stickers_quantity - previous_quantity
+    )
+    mark_competition_statistics_stale(db, collector_album.album.competition_id)
     db.commit()
+    invalidate_collector_statistics(collector_album.collector_id)
     db.refresh(collector_sticker)
     return collector_sticker
 
-@router.get("/missing/{collector_album_id}", response_model=List[StickerResponse])
-async def list_missing_stickers(
-    collector_album_id: int,
+@router.delete("/collector/{collector_sticker_id}")
+def remove_collector_sticker(
+    collector_sticker_id: int,
     db: Session = Depends(get_db)
 ):
-    """List stickers that the collector is missing from an album"""
+    """Remove a sticker from collector's album"""
+    collector_sticker = db.query(CollectorSticker).filter(
+        CollectorSticker.id == collector_sticker_id
+    ).first()
+    if not collector_sticker:
+        raise HTTPException(status_code=404, detail="Collector sticker not found")
+
+    collector_album = lock_collector_album(db, collector_sticker.collector_album_id)
+    db.refresh(collector_sticker)
+    sticker = collector_sticker.sticker
+    removed_quantity = collector_sticker.collector_stickers_quantity
+
+    db.delete(collector_sticker)
+    db.flush()
+    sync_sticker_ownership(db, collector_album, sticker)
+    update_album_completion(collector_album, -removed_quantity)
+    mark_competition_statistics_stale(db, collector_album.album.competition_id)
+    db.commit()
+    invalidate_collector_statistics(collector_album.collector_id)
+    return {"message": "Collector sticker removed successfully"}
+
+def list_missing_stickers_query(
+    db: Session,
+    collector_album_id: int
+):
+    """Query for list_missing_stickers before paging"""
     collector_album = db.query(CollectorAlbum).filter(
         CollectorAlbum.id == collector_album_id
     ).first()
     if not collector_album:
         raise HTTPException(status_code=404, detail="Collector album not found")
 
-    # Get all stickers in the album
-    all_stickers = db.query(Sticker).filter(
-        Sticker.album_id == collector_album.album_id
-    ).all()
+    # Anti-join: only stickers without a collector sticker row holding any copies,
+    # matching sync_sticker_ownership's definition of owned
+    owned = db.query(CollectorSticker.id).filter(
+        CollectorSticker.collector_album_id == collector_album_id,
+        CollectorSticker.sticker_id == Sticker.id,
+        CollectorSticker.collector_stickers_quantity > 0
+    )
+    query = db.query(Sticker).filter(
+        Sticker.album_id == collector_album.album_id,
+        ~owned.exists()
+    )
 
-    # Get collector's stickers
-    owned_sticker_ids = [
-        cs.sticker_id for cs in db.query(CollectorSticker).filter(
-            CollectorSticker.collector_album_id == collector_album_id
-        ).all()
-    ]
+    return query
 
-    # Return stickers not in owned_sticker_ids
-    return [s for s in all_stickers if s.id not in owned_sticker_ids]
+@router.get("/missing/{collector_album_id}", response_model=List[StickerResponse])
+def list_missing_stickers(
+    collector_album_id: int,
+    after_slot: Optional[int] = None,
+    after_id: Optional[int] = None,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List stickers that the collector is missing from an album.
+
+    Results are in album order (``sticker_slot``), since sticker numbers are
+    strings and would sort "10" before "2". To fetch the next page pass the
+    ``X-Next-Cursor`` header as ``cursor``, or the ``sticker_slot`` and ``id``
+    of the last sticker received as ``after_slot`` and ``after_id``.
+    """
+    query = list_missing_stickers_query(db, collector_album_id)
+
+    after = None
+    if after_slot is not None and after_id is not None:
+        after = (after_slot, after_id)
+
+    stickers = page.apply(query, Sticker.sticker_slot, Sticker.id, after=after)
+    return list_response(stickers, StickerResponse, page.response)
+
+@router.get("/ownership/{collector_album_id}", response_model=CollectorAlbumOwnership)
+def get_sticker_ownership(
+    collector_album_id: int,
+    include_slots: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Summarize owned and missing stickers from the ownership bitmap"""
+    row = db.query(
+        CollectorAlbum.album_id,
+        CollectorAlbum.collector_album_owned_bitmap,
+        Album.album_total_stickers
+    ).join(Album).filter(
+        CollectorAlbum.id == collector_album_id
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Collector album not found")
+
+    album_id, bitmap, total_slots = row
+    owned_count = count_bits(bitmap)
+
+    ownership = {
+        "collector_album_id": collector_album_id,
+        "album_id": album_id,
+        "total_slots": total_slots,
+        "owned_count": owned_count,
+        "missing_count": max(total_slots - owned_count, 0),
+        "completion_percentage": (
+            min(owned_count / total_slots * 100, 100) if total_slots > 0 else 0
+        )
+    }
+    if include_slots:
+        ownership["owned_slots"] = list(iter_bits(bitmap, total_slots))
+        ownership["missing_slots"] = list(iter_bits(bitmap, total_slots, value=False))
+    return ownership
+
+@router.get("/ownership/{collector_album_id}/bitmap")
+def get_sticker_ownership_bitmap(
+    collector_album_id: int,
+    db: Session = Depends(get_db)
+):
+    """Return the raw ownership bitmap for local rendering.
+
+    Bit ``n`` (byte ``n // 8``, least significant bit first) is set when the
+    collector owns the sticker whose ``sticker_slot`` is ``n``.
+    """
+    row = db.query(
+        CollectorAlbum.collector_album_owned_bitmap,
+        Album.album_total_stickers
+    ).join(Album).filter(
+        CollectorAlbum.id == collector_album_id
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Collector album not found")
+
+    bitmap, total_slots = row
+    return Response(
+        content=bytes(bitmap),
+        media_type="application/octet-stream",
+        headers={"X-Album-Slots": str(total_slots)}
+    )
@@ -1,12 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload, with_expression
 from typing import List, Optional
+from datetime import datetime
 
 from ....db.session import get_db
 from ....models import (
     TradeRequest, TradeItem, CompanyInventory,
-    InventoryMovement, Collector
+    Collector, TradeStatusTypes, MovementTypes
 )
+from ....services.statistics import (
+    TRADING_VOLUME_MOVEMENT_TYPES,
+    item_competition_id,
+    record_trading_volume,
+    mark_competition_statistics_stale,
+    invalidate_collector_statistics
+)
+from ....services.inventory import (
+    InventoryError,
+    InventoryNotFound,
+    InsufficientInventory,
+    record_movement,
+    reserve_trade_request,
+    settle_trade_request,
+    inventory_balance,
+    resolve_inventory_items
+)
+from ....services.trade_statistics import record_trade_status, trade_statistics
+from ..idempotency import Idempotency, get_idempotency
+from ..pagination import Page, get_page
 from ..schemas.trading import (
     TradeRequestCreate,
     TradeRequestUpdate,
@@ -17,18 +39,71 @@ from ..schemas.trading import (
     CompanyInventoryUpdate,
     CompanyInventoryResponse,
     InventoryMovementCreate,
-    InventoryMovementResponse
+    InventoryMovementResponse,
+    InventoryBalance,
+    TradeStats
 )
 
 router = APIRouter()
 
+TRADE_STATUSES = {
+    value for name, value in vars(TradeStatusTypes).items() if not name.startswith("_")
+}
+
+# Status changes the update endpoint allows, with the movement that settles
+# the stock allocated to the trade (None when nothing is allocated). Pending
+# trades are accepted by reserving their inventory, and completed, cancelled
+# and rejected trades can no longer change.
+TRADE_STATUS_TRANSITIONS = {
+    TradeStatusTypes.PENDING: {
+        TradeStatusTypes.CANCELLED: None,
+        TradeStatusTypes.REJECTED: None,
+    },
+    TradeStatusTypes.ACCEPTED: {
+        TradeStatusTypes.PROCESSING: None,
+        TradeStatusTypes.SHIPPED: MovementTypes.SHIPPED,
+        TradeStatusTypes.COMPLETED: MovementTypes.SHIPPED,
+        TradeStatusTypes.CANCELLED: MovementTypes.RELEASED,
+        TradeStatusTypes.REJECTED: MovementTypes.RELEASED,
+    },
+    TradeStatusTypes.PROCESSING: {
+        TradeStatusTypes.SHIPPED: MovementTypes.SHIPPED,
+        TradeStatusTypes.COMPLETED: MovementTypes.SHIPPED,
+        TradeStatusTypes.CANCELLED: MovementTypes.RELEASED,
+    },
+    TradeStatusTypes.SHIPPED: {
+        TradeStatusTypes.COMPLETED: None,
+    },
+}
+
+def record_competition_trading_volume(db: Session, movement, inventory) -> None:
+    """Count a movement tied to a trade towards its competition's trading volume"""
+    if (
+        movement.trade_request_id is None
+        or movement.inventory_movement_type not in TRADING_VOLUME_MOVEMENT_TYPES
+    ):
+        return
+    competition_id = item_competition_id(
+        db,
+        inventory.company_inventory_item_type,
+        inventory.company_inventory_item_id
+    )
+    if competition_id is not None:
+        record_trading_volume(db, competition_id, movement.inventory_movement_quantity)
+        mark_competition_statistics_stale(db, competition_id)
+
 # Trade Request Endpoints
 @router.post("/request", response_model=TradeRequestResponse)
-async def create_trade_request(
+def create_trade_request(
     trade_request: TradeRequestCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Idempotency = Depends(get_idempotency)
 ):
     """Create a new trade request"""
+    replay = idempotency.replay(trade_request)
+    if replay is not None:
+        return replay
+
     # Verify collector exists
     collector = db.query(Collector).filter(
         Collector.id == trade_request.collector_id
@@ -38,43 +113,115 @@ async def create_trade_request(
 
     db_trade_request = TradeRequest(**trade_request.dict())
     db.add(db_trade_request)
-    db.commit()
+    db.flush()
+    record_trade_status(db, db_trade_request, None, db_trade_request.trade_requests_status)
     db.refresh(db_trade_request)
-    return db_trade_request
+    response = idempotency.store(TradeRequestResponse.from_orm(db_trade_request))
+    db.commit()
+    invalidate_collector_statistics(db_trade_request.collector_id)
+    return response
+
+def trade_request_query(db: Session, include_collector: bool = False):
+    """Query trade requests with their items batch loaded in one extra query"""
+    query = db.query(TradeRequest).options(selectinload(TradeRequest.trade_items))
+    if include_collector:
+        display_name = select(Collector.collector_display_name).where(
+            Collector.id == TradeRequest.collector_id
+        ).scalar_subquery()
+        query = query.options(with_expression(TradeRequest.collector_display_name, display_name))
+    return query
 
 @router.get("/request/{trade_request_id}", response_model=TradeRequestResponse)
-async def get_trade_request(
+def get_trade_request(
     trade_request_id: int,
+    include_collector: bool = False,
     db: Session = Depends(get_db)
 ):
     """Get trade request status and details"""
-    trade_request = db.query(TradeRequest).filter(
+    trade_request = trade_request_query(db, include_collector).filter(
         TradeRequest.id == trade_request_id
     ).first()
     if not trade_request:
         raise HTTPException(status_code=404, detail="Trade request not found")
     return trade_request
 
-@router.get("/requests", response_model=List[TradeRequestResponse])
-async def list_trade_requests(
+def list_trade_requests_query(
+    db: Session,
     collector_id: Optional[int] = None,
     status: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    include_collector: bool = False
 ):
-    """List trade requests with optional filters"""
-    query = db.query(TradeRequest)
+    """Query for list_trade_requests before paging"""
+    query = trade_request_query(db, include_collector)
     
     if collector_id:
         query = query.filter(TradeRequest.collector_id == collector_id)
     if status:
         query = query.filter(TradeRequest.trade_requests_status == status)
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/requests", response_model=List[TradeRequestResponse])
+def list_trade_requests(
+    collector_id: Optional[int] = None,
+    status: Optional[str] = None,
+    include_collector: bool = False,
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List trade requests with optional filters"""
+    query = list_trade_requests_query(db, collector_id, status, include_collector)
+    return page.apply(query, TradeRequest.id)
+
+@router.put("/request/{trade_request_id}", response_model=TradeRequestResponse)
+def update_trade_request(
+    trade_request_id: int,
+    trade_request_data: TradeRequestUpdate,
+    db: Session = Depends(get_db)
+):
+    """Update a trade request's status or tracking number"""
+    # Lock the request so concurrent status changes are counted once
+    trade_request = db.query(TradeRequest).filter(
+        TradeRequest.id == trade_request_id
+    ).with_for_update().first()
+    if not trade_request:
+        raise HTTPException(status_code=404, detail="Trade request not found")
+
+    old_status = trade_request.trade_requests_status
+    new_status = trade_request_data.trade_requests_status
+    if new_status is not None and new_status != old_status:
+        if new_status not in TRADE_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Unknown trade status: {new_status}")
+        allowed = TRADE_STATUS_TRANSITIONS.get(old_status, {})
+        if new_status not in allowed:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Trade request cannot change from {old_status} to {new_status}"
+            )
+        if allowed[new_status] is not None:
+            try:
+                for movement, inventory in settle_trade_request(db, trade_request, allowed[new_status]):
+                    record_competition_trading_volume(db, movement, inventory)
+            except InventoryNotFound as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            except InsufficientInventory as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            except InventoryError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        trade_request.trade_requests_status = new_status
+        record_trade_status(db, trade_request, old_status, new_status)
+
+    if trade_request_data.trade_requests_tracking_number is not None:
+        trade_request.trade_requests_tracking_number = trade_request_data.trade_requests_tracking_number
+
+    db.commit()
+    db.refresh(trade_request)
+    if trade_request.trade_requests_status != old_status:
+        invalidate_collector_statistics(trade_request.collector_id)
+    return trade_request
 
 @router.put("/request/{trade_request_id}/cancel", response_model=TradeRequestResponse)
-async def cancel_trade_request(
+def cancel_trade_request(
     trade_request_id: int,
     db: Session = Depends(get_db)
 ):
@@ -82,7 +229,7 @@ async def cancel_trade_request(
     trade_request = db.query(TradeRequest).filter(
         TradeRequest.id == trade_request_id,
         TradeRequest.trade_requests_status == "pending"
-    ).first()
+    ).with_for_update().first()
     if not trade_request:
         raise HTTPException(
             status_code=404,
@@ -90,43 +237,154 @@ async def cancel_trade_request(
         )
 
     trade_request.trade_requests_status = "cancelled"
+    record_trade_status(db, trade_request, "pending", "cancelled")
+    db.commit()
+    db.refresh(trade_request)
+    invalidate_collector_statistics(trade_request.collector_id)
+    return trade_request
+
+@router.post("/request/{trade_request_id}/items", response_model=TradeItemResponse)
+def add_trade_item(
+    trade_request_id: int,
+    trade_item: TradeItemCreate,
+    db: Session = Depends(get_db)
+):
+    """Add an item to a pending trade request"""
+    if trade_item.trade_request_id != trade_request_id:
+        raise HTTPException(status_code=400, detail="Trade request id does not match the path")
+
+    trade_request = db.query(TradeRequest).filter(
+        TradeRequest.id == trade_request_id,
+        TradeRequest.trade_requests_status == TradeStatusTypes.PENDING
+    ).first()
+    if not trade_request:
+        raise HTTPException(
+            status_code=404,
+            detail="Trade request not found or not in pending status"
+        )
+
+    if trade_item.trade_item_quantity <= 0:
+        raise HTTPException(status_code=400, detail="Quantity must be positive")
+    if trade_item.inventory_id is not None:
+        inventory = db.query(CompanyInventory.id).filter(
+            CompanyInventory.id == trade_item.inventory_id
+        ).first()
+        if not inventory:
+            raise HTTPException(status_code=404, detail="Inventory item not found")
+
+    db_trade_item = TradeItem(**trade_item.dict())
+    db.add(db_trade_item)
+    db.commit()
+    db.refresh(db_trade_item)
+    return db_trade_item
+
+@router.post("/request/{trade_request_id}/reserve", response_model=TradeRequestResponse)
+def reserve_trade_request_inventory(
+    trade_request_id: int,
+    db: Session = Depends(get_db)
+):
+    """Allocate inventory for all outgoing items of a pending trade request"""
+    # Lock the request so it cannot be reserved twice concurrently
+    trade_request = db.query(TradeRequest).filter(
+        TradeRequest.id == trade_request_id,
+        TradeRequest.trade_requests_status == TradeStatusTypes.PENDING
+    ).with_for_update().first()
+    if not trade_request:
+        raise HTTPException(
+            status_code=404,
+            detail="Trade request not found or not in pending status"
+        )
+
+    try:
+        reserve_trade_request(db, trade_request)
+    except InventoryNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientInventory as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except InventoryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    trade_request.trade_requests_status = TradeStatusTypes.ACCEPTED
+    record_trade_status(db, trade_request, TradeStatusTypes.PENDING, TradeStatusTypes.ACCEPTED)
     db.commit()
     db.refresh(trade_request)
     return trade_request
 
 # Company Inventory Endpoints
-@router.get("/inventory", response_model=List[CompanyInventoryResponse])
-async def list_inventory(
+def list_inventory_query(
+    db: Session,
     item_type: Optional[str] = None,
-    is_active: Optional[bool] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    is_active: Optional[bool] = None
 ):
-    """List company inventory items"""
+    """Query for list_inventory before paging"""
     query = db.query(CompanyInventory)
     
     if item_type:
         query = query.filter(CompanyInventory.company_inventory_item_type == item_type)
     if is_active is not None:
         query = query.filter(CompanyInventory.is_active == is_active)
-    
-    return query.offset(skip).limit(limit).all()
+
+    return query
+
+@router.get("/inventory", response_model=List[CompanyInventoryResponse])
+def list_inventory(
+    item_type: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    expand: Optional[str] = Query(None, description="Set to 'item' to include catalog details"),
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_db)
+):
+    """List company inventory items"""
+    if expand not in (None, "item"):
+        raise HTTPException(status_code=400, detail=f"Unknown expand: {expand}")
+
+    query = list_inventory_query(db, item_type, is_active)
+    inventory = page.apply(query, CompanyInventory.id)
+    if expand is None:
+        return inventory
+
+    items = resolve_inventory_items(db, inventory)
+    return [
+        CompanyInventoryResponse.from_orm(row).copy(update={
+            "item": items.get((row.company_inventory_item_type, row.company_inventory_item_id))
+        })
+        for row in inventory
+    ]
 
 @router.post("/inventory", response_model=CompanyInventoryResponse)
-async def add_inventory(
+def add_inventory(
     inventory: CompanyInventoryCreate,
     db: Session = Depends(get_db)
 ):
     """Add new item to company inventory"""
-    db_inventory = CompanyInventory(**inventory.dict())
+    db_inventory = CompanyInventory(
+        company_inventory_item_type=inventory.company_inventory_item_type,
+        company_inventory_item_id=inventory.company_inventory_item_id,
+        company_inventory_quantity_available=0,
+        company_inventory_quantity_allocated=0
+    )
     db.add(db_inventory)
+    db.flush()
+
+    # Opening stock goes through the ledger so balances can be rebuilt from it
+    opening = [
+        (MovementTypes.ADJUSTED, inventory.company_inventory_quantity_available
+            + inventory.company_inventory_quantity_allocated),
+        (MovementTypes.ALLOCATED, inventory.company_inventory_quantity_allocated)
+    ]
+    try:
+        for movement_type, quantity in opening:
+            if quantity:
+                record_movement(db, db_inventory.id, movement_type, quantity)
+    except InventoryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     db.commit()
     db.refresh(db_inventory)
     return db_inventory
 
 @router.put("/inventory/{inventory_id}", response_model=CompanyInventoryResponse)
-async def update_inventory(
+def update_inventory(
     inventory_id: int,
     inventory_data: CompanyInventoryUpdate,
     db: Session = Depends(get_db)
@@ -138,36 +396,85 @@ async def update_inventory(
     if not inventory:
         raise HTTPException(status_code=404, detail="Inventory item not found")
 
-    for field, value in inventory_data.dict(exclude_unset=True).items():
+    changes = inventory_data.dict(exclude_unset=True)
+    allocated = changes.pop("company_inventory_quantity_allocated", None)
+    if allocated is not None and allocated != inventory.company_inventory_quantity_allocated:
+        raise HTTPException(
+            status_code=400,
+            detail="Allocated quantity changes through allocated and released movements"
+        )
+
+    # Stock changes are recorded as adjustments to keep the ledger complete
+    available = changes.pop("company_inventory_quantity_available", None)
+    if available is not None and available != inventory.company_inventory_quantity_available:
+        try:
+            record_movement(
+                db,
+                inventory_id,
+                MovementTypes.ADJUSTED,
+                available - inventory.company_inventory_quantity_available
+            )
+        except InventoryError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        db.refresh(inventory)
+
+    for field, value in changes.items():
         setattr(inventory, field, value)
     
     db.commit()
     db.refresh(inventory)
     return inventory
 
+@router.get("/inventory/{inventory_id}/balance", response_model=InventoryBalance)
+def get_inventory_balance(
+    inventory_id: int,
+    at: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Get an inventory item's balance from the movement ledger, optionally as of a time"""
+    balance = inventory_balance(db, inventory_id, at)
+    if balance is None:
+        raise HTTPException(status_code=404, detail="Inventory item not found")
+    return {**balance._mapping, "at": at}
+
+@router.get("/stats", response_model=TradeStats)
+def get_trade_stats(
+    days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_db)
+):
+    """Get trading statistics over the last days from pre-aggregated counters"""
+    return trade_statistics(db, days)
+
 # Inventory Movement Endpoints
 @router.post("/movement", response_model=InventoryMovementResponse)
-async def record_inventory_movement(
+def record_inventory_movement(
     movement: InventoryMovementCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: Idempotency = Depends(get_idempotency)
 ):
     """Record inventory movement (received, shipped, allocated, released)"""
-    # Verify inventory exists
-    inventory = db.query(CompanyInventory).filter(
-        CompanyInventory.id == movement.inventory_id
-    ).first()
-    if not inventory:
-        raise HTTPException(status_code=404, detail="Inventory item not found")
+    replay = idempotency.replay(movement)
+    if replay is not None:
+        return replay
+
+    try:
+        db_movement, inventory = record_movement(
+            db,
+            movement.inventory_id,
+            movement.inventory_movement_type,
+            movement.inventory_movement_quantity,
+            movement.trade_request_id
+        )
+    except InventoryNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientInventory as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except InventoryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    record_competition_trading_volume(db, db_movement, inventory)
 
-    db_movement = InventoryMovement(**movement.dict())
-    db.add(db_movement)
-    
-    # Update inventory quantity based on movement type
-    if movement.inventory_movement_type in ["received", "released"]:
-        inventory.company_inventory_quantity_available += movement.inventory_movement_quantity
-    elif movement.inventory_movement_type in ["shipped", "allocated"]:
-        inventory.company_inventory_quantity_available -= movement.inventory_movement_quantity
-    
-    db.commit()
     db.refresh(db_movement)
-    return db_movement
+    response = idempotency.store(InventoryMovementResponse.from_orm(db_movement))
+    db.commit()
+    return response
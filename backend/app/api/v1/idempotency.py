@@ -0,0 +1,53 @@
+from typing import Any, Optional
+from fastapi import Depends, Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from ...db.session import get_db
+from ...services.idempotency import (
+    IdempotencyError,
+    IdempotencyKeyMismatch,
+    claim_idempotency_key,
+    store_idempotent_response
+)
+
+class Idempotency:
+    """Idempotency-Key handling for a write endpoint, inside its transaction"""
+
+    def __init__(self, db: Session, key: Optional[str], scope: str):
+        self.db = db
+        self.key = key
+        self.scope = scope
+
+    def replay(self, payload: Any) -> Optional[JSONResponse]:
+        """Claim the key for this request, or return the stored response of an earlier one"""
+        if self.key is None:
+            return None
+        try:
+            stored = claim_idempotency_key(self.db, self.key, self.scope, payload)
+        except IdempotencyKeyMismatch as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except IdempotencyError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if stored is None:
+            return None
+        return JSONResponse(
+            status_code=stored.idempotency_key_status_code,
+            content=stored.idempotency_key_response
+        )
+
+    def store(self, response: Any, status_code: int = 200) -> Any:
+        """Record the response before the write commits, returning it unchanged"""
+        if self.key is not None:
+            store_idempotent_response(
+                self.db, self.key, self.scope, status_code, jsonable_encoder(response)
+            )
+        return response
+
+def get_idempotency(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db)
+) -> Idempotency:
+    return Idempotency(db, idempotency_key, f"{request.method} {request.url.path}")
@@ -0,0 +1,84 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query as SAQuery
+
+from ...core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key values of the last row on a page"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def _matches_key_type(value: Any, key) -> bool:
+    """Whether a decoded cursor value can be compared with a sort key column"""
+    expected = key.type.python_type
+    if isinstance(value, bool) or value is None:
+        return expected is bool and value is not None
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+class Page:
+    """Keyset pagination for a list endpoint, with the next page's cursor in a response header"""
+
+    def __init__(self, response: Response, cursor: Optional[str], skip: int, limit: int):
+        self.response = response
+        self.cursor = cursor
+        self.skip = skip
+        self.limit = min(limit, settings.MAX_PAGE_SIZE)
+
+    def paged(self, query: SAQuery, *keys, after: Optional[Sequence[Any]] = None) -> SAQuery:
+        """Order ``query`` by ``keys``, the last of which must be unique, and limit it to one page.
+
+        Rows after ``cursor`` (or an explicit ``after`` position) are sought
+        through the sort keys; ``skip`` is only honoured without either. One
+        row more than the page is selected to tell whether another follows.
+        """
+        if self.cursor is not None:
+            after = decode_cursor(self.cursor)
+            if len(after) != len(keys) or not all(
+                _matches_key_type(value, key) for value, key in zip(after, keys)
+            ):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        query = query.order_by(*keys)
+        if after is not None:
+            query = query.filter(tuple_(*keys) > tuple_(*after))
+        elif self.skip:
+            query = query.offset(self.skip)
+        return query.limit(self.limit + 1)
+
+    def apply(self, query: SAQuery, *keys, after: Optional[Sequence[Any]] = None) -> list:
+        """Fetch the page selected by ``paged`` and set the next page's cursor"""
+        rows = self.paged(query, *keys, after=after).all()
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+                [getattr(last, key.key) for key in keys]
+            )
+        return rows
+
+def get_page(
+    response: Response,
+    cursor: Optional[str] = Query(None, description=f"Value of a previous {NEXT_CURSOR_HEADER} header"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1)
+) -> Page:
+    return Page(response, cursor, skip, limit)
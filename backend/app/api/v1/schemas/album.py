@@ -72,6 +72,8 @@ class CollectorAlbumResponse(CollectorAlbumBase):
     id: int
     album_id: int
     collector_id: int
+    collector_album_distinct_stickers_owned: int
+    collector_album_completion_percentage: float
     created_at: datetime
     updated_at: datetime
     album: AlbumResponse
@@ -53,6 +53,8 @@ class CollectorAlbumUpdate(CollectorAlbumBase):
 class CollectorAlbumResponse(CollectorAlbumBase):
     id: int
     collector_id: int
+    collector_album_distinct_stickers_owned: int
+    collector_album_completion_percentage: float
     created_at: datetime
     updated_at: datetime
 
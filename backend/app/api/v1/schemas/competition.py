@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 
 class CompetitionBase(BaseModel):
     competition_name: str
@@ -36,14 +36,62 @@ class CompetitionStats(BaseModel):
     most_collected_cards: List[dict]
     trading_volume: int
     average_collection_completion: float
+    refreshed_at: Optional[datetime] = None
+    snapshot_age_seconds: Optional[float] = None
+
+    class Config:
+        orm_mode = True
+
+class TradingVolumeBucket(BaseModel):
+    day: date
+    quantity: int
+    movements: int
+
+class CompetitionTradingVolume(BaseModel):
+    competition_id: int
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    total_quantity: int
+    total_movements: int
+    daily: List[TradingVolumeBucket]
+
+class CompetitionAlbumSummary(BaseModel):
+    id: int
+    album_title: str
+    album_edition: str
+    album_language: str
+    album_publisher: str
+    album_total_stickers: int
+    album_release_year: int
+
+    class Config:
+        orm_mode = True
+
+class CompetitionCardSummary(BaseModel):
+    id: int
+    card_number: str
+    card_player_name: str
+    card_team: str
+    card_edition: str
+    card_rarity_level: int
+
+    class Config:
+        orm_mode = True
+
+class CompetitionMemorabiliaSummary(BaseModel):
+    id: int
+    album_id: int
+    memorabilia_type: Optional[str] = None
+    memorabilia_special_features: Optional[str] = None
 
     class Config:
         orm_mode = True
 
 class CompetitionWithItems(CompetitionResponse):
-    albums: List[dict]
-    cards: List[dict]
-    memorabilia: List[dict]
+    albums: Optional[List[CompetitionAlbumSummary]] = None
+    cards: Optional[List[CompetitionCardSummary]] = None
+    memorabilia: Optional[List[CompetitionMemorabiliaSummary]] = None
+    links: Dict[str, str] = {}
 
     class Config:
         orm_mode = True
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, conlist
 from datetime import datetime
 
 class StickerBase(BaseModel):
@@ -23,6 +23,7 @@ class StickerUpdate(BaseModel):
 
 class StickerResponse(StickerBase):
     id: int
+    sticker_slot: int
     created_at: datetime
     updated_at: datetime
 
@@ -53,6 +54,29 @@ class CollectorStickerResponse(CollectorStickerBase):
     class Config:
         orm_mode = True
 
+class CollectorStickerBulkCreate(BaseModel):
+    collector_album_id: int
+    sticker_numbers: conlist(str, max_items=1000) = []
+    sticker_ids: conlist(int, max_items=1000) = []
+    collector_stickers_condition: str = "mint"
+
+class CollectorStickerBulkResult(BaseModel):
+    added: int
+    new: List[str]
+    duplicates: List[str]
+    unknown_numbers: List[str]
+    unknown_ids: List[int]
+
+class CollectorAlbumOwnership(BaseModel):
+    collector_album_id: int
+    album_id: int
+    total_slots: int
+    owned_count: int
+    missing_count: int
+    completion_percentage: float
+    owned_slots: Optional[List[int]] = None
+    missing_slots: Optional[List[int]] = None
+
 class StickerStats(BaseModel):
     total_in_circulation: int
     rarity_distribution: dict
@@ -20,6 +20,7 @@ class TradeItemBase(BaseModel):
     trade_item_type: str
     trade_item_quantity: int
     trade_item_is_incoming: bool
+    inventory_id: Optional[int] = None
 
 class TradeItemCreate(TradeItemBase):
     pass
@@ -36,6 +37,7 @@ class TradeRequestResponse(TradeRequestBase):
     trade_requests_created_at: datetime
     trade_requests_updated_at: datetime
     trade_items: List[TradeItemResponse] = []
+    collector_display_name: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -67,6 +69,7 @@ class CompanyInventoryResponse(CompanyInventoryBase):
     id: int
     company_inventory_created_at: datetime
     company_inventory_updated_at: datetime
+    item: Optional[dict] = None
 
     class Config:
         orm_mode = True
@@ -76,8 +79,6 @@ class InventoryMovementBase(BaseModel):
     inventory_movement_type: str
     inventory_movement_quantity: int
     trade_request_id: Optional[int] = None
-    notes: Optional[str] = None
-    meta_info: Optional[dict] = None
 
 class InventoryMovementCreate(InventoryMovementBase):
     pass
@@ -89,6 +90,14 @@ class InventoryMovementResponse(InventoryMovementBase):
     class Config:
         orm_mode = True
 
+class InventoryBalance(BaseModel):
+    inventory_id: int
+    at: Optional[datetime] = None
+    available: int
+    allocated: int
+    snapshot_taken_at: Optional[datetime] = None
+    movements: int
+
 class TradeStats(BaseModel):
     total_trades: int
     pending_trades: int
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Type
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_SINGLETON
+
+class APIJSONResponse(ORJSONResponse):
+    """orjson-encoded response, also accepting the non-str dict keys the json module allows"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+# (attribute, nested schema or None, is a list, default) for each field of a schema
+FieldPlan = Tuple[Tuple[str, Optional[Type[BaseModel]], bool, Any], ...]
+
+@lru_cache(maxsize=None)
+def _field_plan(schema: Type[BaseModel]) -> FieldPlan:
+    plan = []
+    for field in schema.__fields__.values():
+        nested = field.type_ if isinstance(field.type_, type) and issubclass(field.type_, BaseModel) else None
+        plan.append((field.name, nested, field.shape != SHAPE_SINGLETON, field.default))
+    return tuple(plan)
+
+def orm_to_dict(obj: Any, schema: Type[BaseModel]) -> dict:
+    """Read the fields of ``schema`` off an ORM object without validating them"""
+    data = {}
+    for name, nested, is_list, default in _field_plan(schema):
+        value = getattr(obj, name, default)
+        if nested is not None and value is not None:
+            if is_list:
+                value = [orm_to_dict(item, nested) for item in value]
+            else:
+                value = orm_to_dict(value, nested)
+        data[name] = value
+    return data
+
+def list_response(
+    rows: Iterable[Any],
+    schema: Type[BaseModel],
+    response: Optional[Response] = None
+) -> APIJSONResponse:
+    """Serialize ORM rows of a read-only list endpoint straight to JSON.
+
+    The rows come from the database already typed, so validating them
+    through ``schema`` again is skipped; ``schema`` only picks the fields.
+    Headers set on ``response`` (e.g. the next page cursor) are carried over.
+    """
+    content: List[dict] = [orm_to_dict(row, schema) for row in rows]
+    headers = dict(response.headers) if response is not None else None
+    return APIJSONResponse(content, headers=headers)
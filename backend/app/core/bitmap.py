@@ -0,0 +1,42 @@
+from typing import Iterator
+
+# Bitmaps are little-endian within each byte: position ``n`` lives in byte
+# ``n // 8`` at bit ``n % 8``. This is the same layout PostgreSQL uses for
+# get_bit/set_bit on bytea, so bitmaps can be inspected directly in SQL.
+
+def _grow(bitmap: bytes, position: int) -> bytearray:
+    data = bytearray(bitmap or b"")
+    required = position // 8 + 1
+    if len(data) < required:
+        data.extend(b"\x00" * (required - len(data)))
+    return data
+
+def set_bit(bitmap: bytes, position: int) -> bytes:
+    """Return a copy of the bitmap with the given position set"""
+    data = _grow(bitmap, position)
+    data[position // 8] |= 1 << (position % 8)
+    return bytes(data)
+
+def clear_bit(bitmap: bytes, position: int) -> bytes:
+    """Return a copy of the bitmap with the given position cleared"""
+    if not bitmap or position // 8 >= len(bitmap):
+        return bitmap or b""
+    data = bytearray(bitmap)
+    data[position // 8] &= ~(1 << (position % 8)) & 0xFF
+    return bytes(data)
+
+def get_bit(bitmap: bytes, position: int) -> bool:
+    """Check whether the given position is set"""
+    if not bitmap or position // 8 >= len(bitmap):
+        return False
+    return bool(bitmap[position // 8] & (1 << (position % 8)))
+
+def count_bits(bitmap: bytes) -> int:
+    """Count the positions set in the bitmap"""
+    return bin(int.from_bytes(bitmap or b"", "little")).count("1")
+
+def iter_bits(bitmap: bytes, size: int, value: bool = True) -> Iterator[int]:
+    """Yield the positions below ``size`` whose bit equals ``value``"""
+    for position in range(size):
+        if get_bit(bitmap, position) == value:
+            yield position
@@ -0,0 +1,162 @@
+import asyncio
+import inspect
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Optional, Sequence
+
+from .config import settings
+
+# Returned by backends on a miss, since None is a valid cached value
+MISSING = object()
+
+class CacheBackend(ABC):
+    """Storage for cached values.
+
+    The in-process ``InMemoryCache`` is the default. A shared store can be
+    installed with ``configure_cache`` when running several workers.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the value stored under key, or MISSING"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """Store a value that expires after ttl seconds"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a key and every key nested under it (``key:...``)"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every key"""
+
+    def __len__(self) -> int:
+        return 0
+
+class InMemoryCache(CacheBackend):
+    """Bounded LRU cache with per-entry expiry, local to the process"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        prefix = f"{key}:"
+        with self._lock:
+            for existing in [k for k in self._entries if k == key or k.startswith(prefix)]:
+                del self._entries[existing]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class Cache:
+    """Front for the configured backend that keys entries by namespace and counts hits"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(namespace: str, *parts: Any) -> str:
+        return ":".join([namespace, *(str(part) for part in parts)])
+
+    def get(self, key: str) -> Any:
+        value = self.backend.get(key)
+        # Lookups run concurrently in the threadpool
+        with self._stats_lock:
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.backend.set(key, value, ttl if ttl is not None else settings.CACHE_DEFAULT_TTL)
+
+    def invalidate(self, namespace: str, *parts: Any) -> None:
+        """Drop the entry for these key parts and any entry keyed more specifically"""
+        self.backend.delete(self.make_key(namespace, *parts))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0
+        }
+
+cache = Cache(InMemoryCache(settings.CACHE_MAX_ENTRIES))
+
+def configure_cache(backend: CacheBackend) -> None:
+    """Replace the cache backend, e.g. with a store shared between workers"""
+    cache.backend = backend
+
+def cached(namespace: str, key: Sequence[str], ttl: Optional[int] = None) -> Callable:
+    """Cache a function's result under the values of the ``key`` arguments.
+
+    Works for plain functions and FastAPI endpoints alike; invalidate entries
+    with ``cache.invalidate(namespace, *key_values)`` from the write paths.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            return cache.make_key(namespace, *(bound.arguments.get(name) for name in key))
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = make_key(args, kwargs)
+                value = cache.get(cache_key)
+                if value is MISSING:
+                    value = await func(*args, **kwargs)
+                    cache.set(cache_key, value, ttl)
+                return value
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = make_key(args, kwargs)
+            value = cache.get(cache_key)
+            if value is MISSING:
+                value = func(*args, **kwargs)
+                cache.set(cache_key, value, ttl)
+            return value
+        return wrapper
+    return decorator
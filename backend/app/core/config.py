@@ -5,15 +5,60 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "StickerMania"
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
+
+    # Debug mode adds X-DB-Queries and X-DB-Time headers to every response
+    DEBUG: bool = False
+
+    # A statement repeated this many times within one request is logged as a suspected N+1
+    N_PLUS_ONE_THRESHOLD: int = 10
     
     POSTGRES_SERVER: str = "localhost"
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "stickermania"
     POSTGRES_PORT: str = "5432"
+
+    # Optional read replica, used for GET requests when set
+    POSTGRES_REPLICA_SERVER: Optional[str] = None
+
+    # Connection pool sizing, applied to the primary and replica engines
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+
+    # Upper bound on the limit accepted by list endpoints
+    MAX_PAGE_SIZE: int = 500
+
+    # Statistics rollups marked stale by writes are recomputed on read once older than this
+    STATISTICS_MAX_AGE_SECONDS: int = 60
+
+    # In-process cache for aggregate endpoints
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_DEFAULT_TTL: int = 300
+
+    # Inventory balance snapshots only cover movements older than this, so
+    # transactions still in flight when a snapshot is taken are not skipped
+    INVENTORY_SNAPSHOT_LAG_SECONDS: int = 300
+
+    # Trade statistics counters are split into this many rows per key, so
+    # concurrent writes rarely wait on the same row; reads sum the shards
+    TRADE_STATISTICS_SHARDS: int = 8
+
+    # Inventory at or below this available quantity is reported as low stock
+    LOW_STOCK_THRESHOLD: int = 10
+
+    # Responses stored for Idempotency-Key retries are kept this long
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
     
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def SQLALCHEMY_REPLICA_DATABASE_URI(self) -> Optional[str]:
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
 settings = Settings()
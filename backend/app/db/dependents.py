@@ -0,0 +1,78 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from sqlalchemy import Column, Table, exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from .session import Base
+
+def _table(model) -> Table:
+    return model if isinstance(model, Table) else model.__table__
+
+def _referencing_columns(table: Table) -> Dict[Table, List[Column]]:
+    """Foreign key columns in other tables that point at the table's id"""
+    # Matched by name so unresolvable foreign keys elsewhere (collectors.user_id) are skipped
+    target = f"{table.name}.id"
+    references = defaultdict(list)
+    for child in Base.metadata.tables.values():
+        if child is table:
+            continue
+        for foreign_key in child.foreign_keys:
+            if foreign_key.target_fullname == target:
+                references[child].append(foreign_key.parent)
+    return references
+
+def find_dependents(db: Session, model, row_id: int, ignore: Iterable = ()) -> List[str]:
+    """Names of the tables holding rows that reference the given row.
+
+    Runs one EXISTS query per referencing table without loading any rows.
+    Tables in ``ignore`` (e.g. rollups derived from the row) are skipped.
+    """
+    ignored = {_table(item) for item in ignore}
+    dependents = []
+    for child, columns in _referencing_columns(_table(model)).items():
+        if child in ignored:
+            continue
+        if db.query(exists().where(or_(*[column == row_id for column in columns]))).scalar():
+            dependents.append(child.name)
+    return dependents
+
+def plan_cascade_delete(db: Session, model, row_id: int) -> Dict[str, int]:
+    """Count the rows per table that a cascading delete of the row would remove.
+
+    Each table's rows are selected with nested ``IN (SELECT id ...)`` clauses
+    following every foreign key path back to the row, so rows reachable
+    along several paths are counted once and nothing is loaded.
+    """
+    root = _table(model)
+    selections = {root: root.c.id == row_id}
+
+    def selection(table: Table, visiting: frozenset):
+        if table not in selections:
+            clauses = []
+            for foreign_key in table.foreign_keys:
+                parent_name = foreign_key.target_fullname.split(".")[0]
+                parent = Base.metadata.tables.get(parent_name)
+                if parent is None or parent not in reachable or parent in visiting:
+                    continue
+                parent_ids = select(parent.c.id).where(selection(parent, visiting | {table}))
+                clauses.append(foreign_key.parent.in_(parent_ids))
+            selections[table] = or_(*clauses)
+        return selections[table]
+
+    reachable = {root}
+    pending = [root]
+    while pending:
+        for child in _referencing_columns(pending.pop()):
+            if child not in reachable:
+                reachable.add(child)
+                pending.append(child)
+
+    plan = {}
+    for table in sorted(reachable - {root}, key=lambda table: table.name):
+        count = db.query(func.count()).select_from(table).filter(
+            selection(table, frozenset())
+        ).scalar()
+        if count:
+            plan[table.name] = count
+    return plan
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryStats:
+    """Statements executed while a tracking scope was active"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least ``threshold`` times, most frequent first.
+
+        Parameters are bound separately, so a statement repeated with only
+        different values, typically a lazy load per row, shows up here.
+        """
+        with self._lock:
+            return [
+                (statement, count) for statement, count in self.statements.most_common()
+                if count >= threshold
+            ]
+
+# Tracking scopes active in the current context; nested scopes all see each statement
+_active_stats: ContextVar[Tuple[QueryStats, ...]] = ContextVar("active_query_stats", default=())
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_started_at"].pop()
+    for stats in _active_stats.get():
+        stats.record(statement, seconds)
+
+def _handle_error(context):
+    # The statement failed, so no after_cursor_execute will pop its start time
+    if context.connection is not None and context.connection.info.get("query_started_at"):
+        context.connection.info["query_started_at"].pop()
+
+def instrument_engine(engine: Engine) -> None:
+    """Report the statements an engine executes to the active tracking scopes"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements executed in this context, including threadpool work it starts"""
+    stats = QueryStats()
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail with AssertionError when the block executes more than ``limit`` statements.
+
+    Meant for tests holding an endpoint to a query budget, e.g.
+    ``with assert_max_queries(2): client.get("/api/v1/trading/requests")``.
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        statements = "\n".join(
+            f"{count}x {statement}" for statement, count in stats.statements.most_common()
+        )
+        raise AssertionError(
+            f"Expected at most {limit} queries, executed {stats.count}:\n{statements}"
+        )
@@ -1,18 +1,61 @@
+from contextlib import contextmanager
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
 from ..core.config import settings
+from .metrics import TimedQueuePool
+from .query_counter import instrument_engine
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+# Requests with these methods are served from the read replica when one is configured
+READ_ONLY_METHODS = ("GET", "HEAD")
+
+def _create_engine(uri: str):
+    engine = create_engine(
+        uri,
+        poolclass=TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    )
+    instrument_engine(engine)
+    return engine
+
+engine = _create_engine(settings.SQLALCHEMY_DATABASE_URI)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if settings.SQLALCHEMY_REPLICA_DATABASE_URI:
+    read_engine = _create_engine(settings.SQLALCHEMY_REPLICA_DATABASE_URI)
+    ReadSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=read_engine, info={"replica": True}
+    )
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
 Base = declarative_base()
 
 # Dependency to use in FastAPI endpoints
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    session_factory = ReadSessionLocal if request.method in READ_ONLY_METHODS else SessionLocal
+    db = session_factory()
     try:
         yield db
     finally:
         db.close()
+
+@contextmanager
+def primary_session(db: Session):
+    """Yield a session that can write, reusing db unless it reads from the replica"""
+    if not db.info.get("replica"):
+        yield db
+        return
+
+    primary = SessionLocal()
+    try:
+        yield primary
+    finally:
+        primary.close()
@@ -1,9 +1,16 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .core.config import settings
 from .api.v1 import api_router
+from .api.v1.serialization import APIJSONResponse
+from .db.query_counter import QueryStats, track_queries
+
+logger = logging.getLogger(__name__)
 
 def custom_openapi():
     if app.openapi_schema:
@@ -25,6 +32,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=APIJSONResponse,
 )
 
 # Set custom OpenAPI schema
@@ -37,8 +45,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-DB-Queries", "X-DB-Time"],
 )
 
+class QueryCountMiddleware:
+    """Count the SQL statements each request executes and flag suspected N+1 patterns.
+
+    Plain ASGI rather than ``@app.middleware("http")`` so streamed bodies pass
+    through unbuffered. The debug headers cover the statements run before the
+    response starts; the N+1 check runs after the last body chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_counted(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers["X-DB-Time"] = f"{stats.seconds * 1000:.2f}ms"
+                await send(message)
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    log_repeated_queries(scope, stats)
+
+            await self.app(scope, receive, send_counted)
+
+def log_repeated_queries(scope: Scope, stats: QueryStats) -> None:
+    """Warn about statements a request repeated often enough to suggest N+1 loading"""
+    for statement, count in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning(
+            "Suspected N+1 in %s %s: statement executed %d times: %s",
+            scope["method"], scope["path"], count, " ".join(statement.split())[:500]
+        )
+
+app.add_middleware(QueryCountMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
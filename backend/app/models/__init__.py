@@ -9,7 +9,12 @@ from .box import Box, CollectorBox
 from .memorabilia import Memorabilia, CollectorMemorabilia
 from .trading import (
     TradeRequest, TradeItem, CompanyInventory,
-    InventoryMovement
+    InventoryMovement, InventoryBalanceSnapshot
+)
+from .idempotency import IdempotencyKey
+from .statistics import (
+    CompetitionStatistics, CompetitionTradingVolume,
+    TradeStatusCount, TradeItemVolume, InventoryMovementVolume, InventoryStockCount
 )
 from .types import (
     CompetitionTypes,
@@ -51,6 +56,13 @@ models = [
     TradeItem,
     CompanyInventory,
     InventoryMovement,
+    InventoryBalanceSnapshot,
+    CompetitionStatistics,
+    CompetitionTradingVolume,
+    TradeStatusCount,
+    TradeItemVolume,
+    InventoryMovementVolume,
+    IdempotencyKey,
 ]
 
 __all__ = [
@@ -76,6 +88,14 @@ __all__ = [
     "TradeItem",
     "CompanyInventory",
     "InventoryMovement",
+    "InventoryBalanceSnapshot",
+    "CompetitionStatistics",
+    "CompetitionTradingVolume",
+    "TradeStatusCount",
+    "TradeItemVolume",
+    "InventoryMovementVolume",
+    "InventoryStockCount",
+    "IdempotencyKey",
     # Types
     "CompetitionTypes",
     "AlbumTypes",
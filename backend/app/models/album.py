@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, LargeBinary, Float, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -14,10 +14,16 @@ class Album(BaseModel):
     album_total_stickers = Column(Integer, nullable=False)
     album_release_year = Column(Integer, nullable=False)
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_albums_competition_id_edition', 'competition_id', 'album_edition'),
+        Index('ix_albums_edition', 'album_edition'),
+    )
+
     # Relationships
     competition = relationship("Competition", back_populates="albums")
     sections = relationship("AlbumSection", back_populates="album")
-    stickers = relationship("Sticker", back_populates="album")
+    stickers = relationship("Sticker", foreign_keys="Sticker.album_id", back_populates="album")
     collector_albums = relationship("CollectorAlbum", back_populates="album")
 
 class AlbumSection(BaseModel):
@@ -29,6 +35,11 @@ class AlbumSection(BaseModel):
     album_section_type = Column(String, nullable=False)  # teams, stadiums, special_events, etc.
     album_section_sticker_count = Column(Integer, nullable=False)
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_album_sections_album_id_order', 'album_id', 'album_section_order'),
+    )
+
     # Relationships
     album = relationship("Album", back_populates="sections")
 
@@ -38,7 +49,16 @@ class CollectorAlbum(BaseModel):
     collector_id = Column(Integer, ForeignKey("collectors.id"), nullable=False)
     album_id = Column(Integer, ForeignKey("albums.id"), nullable=False)
     collector_album_completion = Column(String, nullable=False)
-    collector_album_total_stickers_owned = Column(Integer, default=0)
+    collector_album_total_stickers_owned = Column(Integer, default=0)  # including duplicates
+    collector_album_distinct_stickers_owned = Column(Integer, nullable=False, default=0, server_default="0")
+    collector_album_completion_percentage = Column(Float, nullable=False, default=0, server_default="0")
+    collector_album_owned_bitmap = Column(LargeBinary, nullable=False, default=b"", server_default="")  # one bit per sticker slot
+
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_collector_albums_collector_id_completion', 'collector_id', 'collector_album_completion_percentage'),
+        Index('ix_collector_albums_album_id', 'album_id'),
+    )
 
     # Relationships
     collector = relationship("Collector", back_populates="albums")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -12,6 +12,11 @@ class Box(BaseModel):
     box_pack_count = Column(Integer, nullable=False)
     box_special_features = Column(String, nullable=True)
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_boxes_album_id_edition', 'album_id', 'box_edition'),
+    )
+
     # Relationships
     album = relationship("Album", foreign_keys=[album_id])
     publisher = relationship("Album", foreign_keys=[album_publisher])
@@ -26,6 +31,11 @@ class CollectorBox(BaseModel):
     collector_box_condition = Column(String, nullable=False)
     collector_box_is_sealed = Column(Boolean, default=True)
 
+    # Add unique constraint so repeated additions increase the quantity
+    __table_args__ = (
+        UniqueConstraint('collector_id', 'box_id', name='uq_collector_boxes_collector_box'),
+    )
+
     # Relationships
     collector = relationship("Collector", back_populates="boxes")
     box = relationship("Box", back_populates="collector_boxes")
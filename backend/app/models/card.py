@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, CheckConstraint, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, CheckConstraint, Boolean, UniqueConstraint, Index, DDL, event
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -16,12 +16,31 @@ class Card(BaseModel):
     # Add check constraint for rarity level
     __table_args__ = (
         CheckConstraint('card_rarity_level BETWEEN 1 AND 5', name='check_card_rarity_level'),
+        Index('ix_cards_competition_id_edition', 'competition_id', 'card_edition'),
+        # Trigram indexes serve the substring (ILIKE '%...%') player and team filters
+        Index(
+            'ix_cards_player_name_trgm', 'card_player_name',
+            postgresql_using='gin', postgresql_ops={'card_player_name': 'gin_trgm_ops'}
+        ),
+        Index(
+            'ix_cards_team_trgm', 'card_team',
+            postgresql_using='gin', postgresql_ops={'card_team': 'gin_trgm_ops'}
+        ),
     )
 
     # Relationships
     competition = relationship("Competition", back_populates="cards")
     collector_cards = relationship("CollectorCard", back_populates="card")
 
+# The trigram operator classes come from pg_trgm, which create_all (as run by
+# scripts/init_db.py) must install before the cards indexes; migration 0010
+# does the same for migrated databases
+event.listen(
+    Card.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
 class CollectorCard(BaseModel):
     __tablename__ = "collector_cards"
 
@@ -31,6 +50,11 @@ class CollectorCard(BaseModel):
     collector_card_condition = Column(String, nullable=False)
     collector_card_is_duplicate = Column(Boolean, default=False)
 
+    # Add unique constraint so repeated additions increase the quantity
+    __table_args__ = (
+        UniqueConstraint('collector_id', 'card_id', name='uq_collector_cards_collector_card'),
+    )
+
     # Relationships
     collector = relationship("Collector", back_populates="cards")
     card = relationship("Card", back_populates="collector_cards")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -11,6 +11,12 @@ class Competition(BaseModel):
     competition_host_country = Column(String, nullable=False)
     competition_winner = Column(String, nullable=True)
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_competitions_type_year', 'competition_type', 'competition_year'),
+        Index('ix_competitions_host_country', 'competition_host_country'),
+    )
+
     # Relationships
     albums = relationship("Album", back_populates="competition")
     cards = relationship("Card", back_populates="competition")
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Index, UniqueConstraint
+from .base import BaseModel
+
+class IdempotencyKey(BaseModel):
+    __tablename__ = "idempotency_keys"
+
+    idempotency_key = Column(String(255), nullable=False)
+    idempotency_key_scope = Column(String, nullable=False)  # method and path the key was used for
+    idempotency_key_fingerprint = Column(String(64), nullable=False)  # sha256 of the request body
+    idempotency_key_status_code = Column(Integer, nullable=True)
+    idempotency_key_response = Column(JSON, nullable=True)
+    idempotency_key_expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    # A key is unique per endpoint; the purge job looks keys up by expiry
+    __table_args__ = (
+        UniqueConstraint('idempotency_key', 'idempotency_key_scope', name='uq_idempotency_keys_key_scope'),
+        Index('ix_idempotency_keys_expires_at', 'idempotency_key_expires_at'),
+    )
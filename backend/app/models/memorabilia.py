@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -9,6 +9,11 @@ class Memorabilia(BaseModel):
     memorabilia_type = Column(String, nullable=True)
     memorabilia_special_features = Column(String, nullable=True)
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_memorabilia_album_id_type', 'album_id', 'memorabilia_type'),
+    )
+
     # Relationships
     album = relationship("Album")
     collector_memorabilia = relationship("CollectorMemorabilia", back_populates="memorabilia")
@@ -22,6 +27,11 @@ class CollectorMemorabilia(BaseModel):
     collector_memorabilia_condition = Column(String, nullable=True)
     collector_memorabilia_is_sealed = Column(Boolean, default=True)
 
+    # Add unique constraint so repeated additions increase the quantity
+    __table_args__ = (
+        UniqueConstraint('collector_id', 'memorabilia_id', name='uq_collector_memorabilia_collector_memorabilia'),
+    )
+
     # Relationships
     collector = relationship("Collector", backref="memorabilia")
     memorabilia = relationship("Memorabilia", back_populates="collector_memorabilia")
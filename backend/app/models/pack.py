@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -14,6 +14,11 @@ class Pack(BaseModel):
     pack_sticker_count = Column(Integer, nullable=False)
     pack_special_features = Column(String, nullable=True)
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_packs_album_id_edition', 'album_id', 'pack_edition'),
+    )
+
     # Relationships
     album = relationship("Album", foreign_keys=[album_id])
     publisher = relationship("Album", foreign_keys=[album_publisher])
@@ -28,6 +33,11 @@ class CollectorPack(BaseModel):
     collector_pack_condition = Column(String, nullable=True)
     collector_pack_is_sealed = Column(Boolean, default=True)
 
+    # Add unique constraint so repeated additions increase the quantity
+    __table_args__ = (
+        UniqueConstraint('collector_id', 'pack_id', name='uq_collector_packs_collector_pack'),
+    )
+
     # Relationships
     collector = relationship("Collector", back_populates="packs")
     pack = relationship("Pack", back_populates="collector_packs")
@@ -0,0 +1,96 @@
+from sqlalchemy import Column, Integer, Float, Boolean, Date, DateTime, ForeignKey, JSON, String, UniqueConstraint
+from sqlalchemy.orm import relationship
+from .base import BaseModel
+
+class CompetitionStatistics(BaseModel):
+    __tablename__ = "competition_statistics"
+
+    competition_id = Column(Integer, ForeignKey("competitions.id"), nullable=False, unique=True)
+    competition_statistics_total_albums = Column(Integer, nullable=False, default=0)
+    competition_statistics_total_cards = Column(Integer, nullable=False, default=0)
+    competition_statistics_total_collectors = Column(Integer, nullable=False, default=0)
+    competition_statistics_completion_rate = Column(Float, nullable=False, default=0)
+    competition_statistics_average_completion = Column(Float, nullable=False, default=0)
+    competition_statistics_most_collected_albums = Column(JSON, nullable=False, default=list)
+    competition_statistics_most_collected_cards = Column(JSON, nullable=False, default=list)
+    competition_statistics_trading_volume = Column(Integer, nullable=False, default=0)
+    competition_statistics_is_stale = Column(Boolean, nullable=False, default=False)  # set by write paths, cleared on refresh
+    competition_statistics_refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Relationships
+    competition = relationship("Competition")
+
+class CompetitionTradingVolume(BaseModel):
+    __tablename__ = "competition_trading_volume"
+
+    competition_id = Column(Integer, ForeignKey("competitions.id"), nullable=False)
+    competition_trading_volume_date = Column(Date, nullable=False)
+    competition_trading_volume_quantity = Column(Integer, nullable=False, default=0)
+    competition_trading_volume_movements = Column(Integer, nullable=False, default=0)
+
+    # One bucket per competition and day
+    __table_args__ = (
+        UniqueConstraint('competition_id', 'competition_trading_volume_date', name='uq_competition_trading_volume_day'),
+    )
+
+    # Relationships
+    competition = relationship("Competition")
+
+class TradeStatusCount(BaseModel):
+    __tablename__ = "trade_status_counts"
+
+    trade_status_counts_status = Column(String, nullable=False)
+    trade_status_counts_shard = Column(Integer, nullable=False, default=0)
+    trade_status_counts_count = Column(Integer, nullable=False, default=0)  # trade requests currently in this status, summed over shards
+    trade_status_counts_processing_seconds = Column(Float, nullable=False, default=0)  # creation to completion time of completed trades, summed
+
+    # One counter per status and shard; writes spread over the shards
+    __table_args__ = (
+        UniqueConstraint(
+            'trade_status_counts_status', 'trade_status_counts_shard',
+            name='uq_trade_status_counts_status_shard'
+        ),
+    )
+
+class TradeItemVolume(BaseModel):
+    __tablename__ = "trade_item_volume"
+
+    trade_item_volume_date = Column(Date, nullable=False)
+    trade_item_volume_item_type = Column(String, nullable=False)
+    trade_item_volume_item_id = Column(Integer, nullable=False)
+    trade_item_volume_shard = Column(Integer, nullable=False, default=0)
+    trade_item_volume_quantity = Column(Integer, nullable=False, default=0)
+    trade_item_volume_movements = Column(Integer, nullable=False, default=0)
+
+    # One bucket per item, day and shard
+    __table_args__ = (
+        UniqueConstraint(
+            'trade_item_volume_date', 'trade_item_volume_item_type', 'trade_item_volume_item_id',
+            'trade_item_volume_shard',
+            name='uq_trade_item_volume_day_item_shard'
+        ),
+    )
+
+class InventoryMovementVolume(BaseModel):
+    __tablename__ = "inventory_movement_volume"
+
+    inventory_movement_volume_date = Column(Date, nullable=False)
+    inventory_movement_volume_type = Column(String, nullable=False)
+    inventory_movement_volume_shard = Column(Integer, nullable=False, default=0)
+    inventory_movement_volume_quantity = Column(Integer, nullable=False, default=0)
+    inventory_movement_volume_movements = Column(Integer, nullable=False, default=0)
+
+    # One bucket per movement type, day and shard
+    __table_args__ = (
+        UniqueConstraint(
+            'inventory_movement_volume_date', 'inventory_movement_volume_type',
+            'inventory_movement_volume_shard',
+            name='uq_inventory_movement_volume_day_type_shard'
+        ),
+    )
+
+class InventoryStockCount(BaseModel):
+    __tablename__ = "inventory_stock_counts"
+
+    inventory_stock_counts_shard = Column(Integer, nullable=False, unique=True)
+    inventory_stock_counts_quantity = Column(Integer, nullable=False, default=0)  # available plus allocated units, summed over shards
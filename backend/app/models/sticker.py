@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, CheckConstraint
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -13,10 +13,13 @@ class Sticker(BaseModel):
     sticker_rarity_level = Column(Integer, nullable=False)
     language = Column(String, nullable=True)
     sticker_print_variation = Column(String, nullable=True)
+    sticker_slot = Column(Integer, nullable=False)  # zero-based position in the album's ownership bitmap
 
     # Add check constraint for rarity level
     __table_args__ = (
         CheckConstraint('sticker_rarity_level BETWEEN 1 AND 5', name='check_rarity_level'),
+        UniqueConstraint('album_id', 'sticker_slot', name='uq_stickers_album_slot'),
+        Index('ix_stickers_album_id_slot', 'album_id', 'sticker_slot', 'id'),
     )
 
     # Relationships
@@ -33,6 +36,12 @@ class CollectorSticker(BaseModel):
     collector_stickers_condition = Column(String, nullable=False)
     collector_stickers_is_duplicate = Column(Boolean, nullable=False, default=False)
 
+    # Add unique constraint so repeated additions increase the quantity
+    __table_args__ = (
+        UniqueConstraint('collector_album_id', 'sticker_id', name='uq_collector_stickers_album_sticker'),
+        Index('ix_collector_stickers_sticker_id', 'sticker_id'),
+    )
+
     # Relationships
     collector_album = relationship("CollectorAlbum", back_populates="collector_stickers")
     sticker = relationship("Sticker", back_populates="collector_stickers")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean, TIMESTAMP, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean, TIMESTAMP, Index, func
+from sqlalchemy.orm import relationship, query_expression
 from .base import BaseModel
 
 class CompanyInventory(BaseModel):
@@ -12,6 +12,12 @@ class CompanyInventory(BaseModel):
     company_inventory_created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     company_inventory_updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_company_inventory_item', 'company_inventory_item_type', 'company_inventory_item_id'),
+        Index('ix_company_inventory_quantity_available', 'company_inventory_quantity_available'),
+    )
+
 class TradeRequest(BaseModel):
     __tablename__ = "trade_requests"
 
@@ -22,6 +28,15 @@ class TradeRequest(BaseModel):
     trade_requests_created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     trade_requests_updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_trade_requests_collector_id_status', 'collector_id', 'trade_requests_status'),
+        Index('ix_trade_requests_status', 'trade_requests_status'),
+    )
+
+    # Filled in by queries that ask for it with with_expression, None otherwise
+    collector_display_name = query_expression()
+
     # Relationships
     collector = relationship("Collector", back_populates="trade_requests")
     trade_items = relationship("TradeItem", back_populates="trade_request")
@@ -33,10 +48,17 @@ class TradeItem(BaseModel):
     trade_item_type = Column(String, nullable=False)
     trade_item_quantity = Column(Integer, nullable=False)
     trade_item_is_incoming = Column(Boolean, nullable=False)  # true for items coming to company, false for items going to collector
+    inventory_id = Column(Integer, ForeignKey("company_inventory.id"), nullable=True, index=True)  # stock reserved for outgoing items
     trade_item_created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_trade_items_trade_request_id', 'trade_request_id'),
+    )
+
     # Relationships
     trade_request = relationship("TradeRequest", back_populates="trade_items")
+    inventory = relationship("CompanyInventory")
 
 class InventoryMovement(BaseModel):
     __tablename__ = "inventory_movement"
@@ -47,6 +69,32 @@ class InventoryMovement(BaseModel):
     trade_request_id = Column(Integer, ForeignKey("trade_requests.id"), nullable=True)
     inventory_movement_created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
+    # Indexes matched to the list endpoint filters
+    __table_args__ = (
+        Index('ix_inventory_movement_inventory_id_created_at', 'inventory_id', 'inventory_movement_created_at'),
+        Index('ix_inventory_movement_trade_request_id', 'trade_request_id'),
+    )
+
     # Relationships
     inventory = relationship("CompanyInventory")
     trade_request = relationship("TradeRequest")
+
+class InventoryBalanceSnapshot(BaseModel):
+    __tablename__ = "inventory_balance_snapshots"
+
+    inventory_id = Column(Integer, ForeignKey("company_inventory.id"), nullable=False)
+    inventory_balance_snapshot_available = Column(Integer, nullable=False)
+    inventory_balance_snapshot_allocated = Column(Integer, nullable=False)
+    inventory_balance_snapshot_taken_at = Column(TIMESTAMP, nullable=False)  # covers movements created up to this time
+
+    # Relationships
+    inventory = relationship("CompanyInventory")
+
+    # Balance queries read the latest snapshot of an item before a point in time
+    __table_args__ = (
+        Index(
+            "ix_inventory_balance_snapshots_inventory_taken_at",
+            "inventory_id",
+            "inventory_balance_snapshot_taken_at"
+        ),
+    )
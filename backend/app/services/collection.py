@@ -0,0 +1,190 @@
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import func, or_, Integer
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.bitmap import set_bit, clear_bit, get_bit, count_bits
+from ..models import Sticker, CollectorSticker, CollectorAlbum
+
+def next_sticker_slot(db: Session, album_id: int) -> int:
+    """Return the next free ownership slot for a sticker in an album"""
+    current = db.query(func.max(Sticker.sticker_slot)).filter(
+        Sticker.album_id == album_id
+    ).scalar()
+    return 0 if current is None else current + 1
+
+def upsert_collector_items(
+    db: Session,
+    model,
+    rows: Sequence[Dict],
+    key_columns: Sequence[str],
+    quantity_column: str,
+    duplicate_column: Optional[str] = None
+) -> List[int]:
+    """Insert collector item rows, adding to the quantity of existing ones.
+
+    Relies on the unique constraint over ``key_columns``: a conflicting row
+    has the new quantity added to it and, when the model tracks duplicates,
+    its duplicate flag recomputed, all in a single INSERT ... ON CONFLICT.
+    Returns the ids of the affected rows.
+    """
+    stmt = insert(model).values(list(rows))
+    quantity = getattr(model, quantity_column) + stmt.excluded[quantity_column]
+    changes = {quantity_column: quantity, "updated_at": func.now()}
+    if duplicate_column:
+        changes[duplicate_column] = quantity > 1
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key_columns), set_=changes
+    ).returning(model.id)
+    return [row_id for row_id, in db.execute(stmt)]
+
+def lock_collector_album(db: Session, collector_album_id: int) -> Optional[CollectorAlbum]:
+    """Load a collector album locking its row until the transaction ends.
+
+    Every change to a collector's stickers goes through this lock so that
+    concurrent writes cannot overwrite each other's bitmap updates.
+    """
+    return db.query(CollectorAlbum).filter(
+        CollectorAlbum.id == collector_album_id
+    ).with_for_update().first()
+
+def set_sticker_owned(collector_album: CollectorAlbum, sticker: Sticker, owned: bool) -> None:
+    """Set or clear the sticker's bit in the collector album's bitmap"""
+    bitmap = collector_album.collector_album_owned_bitmap or b""
+    if owned:
+        bitmap = set_bit(bitmap, sticker.sticker_slot)
+    else:
+        bitmap = clear_bit(bitmap, sticker.sticker_slot)
+    collector_album.collector_album_owned_bitmap = bitmap
+
+def sync_sticker_ownership(db: Session, collector_album: CollectorAlbum, sticker: Sticker) -> None:
+    """Recompute a sticker's bit from the collector's sticker rows"""
+    owned = db.query(
+        db.query(CollectorSticker.id).filter(
+            CollectorSticker.collector_album_id == collector_album.id,
+            CollectorSticker.sticker_id == sticker.id,
+            CollectorSticker.collector_stickers_quantity > 0
+        ).exists()
+    ).scalar()
+    set_sticker_owned(collector_album, sticker, owned)
+
+def bulk_add_collector_stickers(
+    db: Session,
+    collector_album: CollectorAlbum,
+    sticker_numbers: List[str],
+    sticker_ids: List[int],
+    condition: str
+) -> Dict:
+    """Add a batch of stickers (e.g. a freshly opened box) to a collector album.
+
+    The collector album must already be locked with ``lock_collector_album``.
+    Stickers are resolved in one query and all of them are upserted with a
+    single multi-row INSERT ... ON CONFLICT. Repeated numbers or ids in the
+    batch count as additional copies.
+    """
+    stickers = db.query(
+        Sticker.id, Sticker.sticker_number, Sticker.sticker_slot
+    ).filter(
+        Sticker.album_id == collector_album.album_id,
+        or_(
+            Sticker.sticker_number.in_(set(sticker_numbers)),
+            Sticker.id.in_(set(sticker_ids))
+        )
+    ).order_by(Sticker.id).all()
+
+    by_id = {sticker.id: sticker for sticker in stickers}
+    by_number = {}
+    for sticker in stickers:
+        by_number.setdefault(sticker.sticker_number, sticker)
+
+    copies = Counter()
+    unknown_numbers = []
+    unknown_ids = []
+    for number in sticker_numbers:
+        if number in by_number:
+            copies[by_number[number].id] += 1
+        else:
+            unknown_numbers.append(number)
+    for sticker_id in sticker_ids:
+        if sticker_id in by_id:
+            copies[sticker_id] += 1
+        else:
+            unknown_ids.append(sticker_id)
+
+    bitmap = collector_album.collector_album_owned_bitmap or b""
+    new = []
+    duplicates = []
+    for sticker_id, quantity in copies.items():
+        sticker = by_id[sticker_id]
+        already_owned = get_bit(bitmap, sticker.sticker_slot)
+        if not already_owned:
+            new.append(sticker.sticker_number)
+        if already_owned or quantity > 1:
+            duplicates.append(sticker.sticker_number)
+        bitmap = set_bit(bitmap, sticker.sticker_slot)
+
+    if copies:
+        upsert_collector_items(
+            db,
+            CollectorSticker,
+            [
+                {
+                    "collector_album_id": collector_album.id,
+                    "sticker_id": sticker_id,
+                    "collector_stickers_quantity": quantity,
+                    "collector_stickers_condition": condition,
+                    "collector_stickers_is_duplicate": quantity > 1
+                }
+                for sticker_id, quantity in copies.items()
+            ],
+            ("collector_album_id", "sticker_id"),
+            "collector_stickers_quantity",
+            "collector_stickers_is_duplicate"
+        )
+
+    collector_album.collector_album_owned_bitmap = bitmap
+    update_album_completion(collector_album, sum(copies.values()))
+
+    return {
+        "added": sum(copies.values()),
+        "new": new,
+        "duplicates": duplicates,
+        "unknown_numbers": unknown_numbers,
+        "unknown_ids": unknown_ids
+    }
+
+def update_album_completion(collector_album: CollectorAlbum, quantity_delta: int = 0) -> None:
+    """Refresh a collector album's completion counters after a sticker change.
+
+    Must run after the ownership bitmap has been updated. The legacy
+    ``collector_album_completion`` string is kept in sync for older clients.
+    """
+    distinct_owned = count_bits(collector_album.collector_album_owned_bitmap)
+    total_stickers = collector_album.album.album_total_stickers
+    percentage = (
+        min(distinct_owned / total_stickers * 100, 100) if total_stickers > 0 else 0
+    )
+
+    collector_album.collector_album_total_stickers_owned = max(
+        (collector_album.collector_album_total_stickers_owned or 0) + quantity_delta, 0
+    )
+    collector_album.collector_album_distinct_stickers_owned = distinct_owned
+    collector_album.collector_album_completion_percentage = percentage
+    collector_album.collector_album_completion = f"{int(percentage)}%"
+
+def recompute_album_completion(db: Session, album_id: int, total_stickers: int) -> None:
+    """Recompute every collector's completion after an album's size changes"""
+    percentage = (
+        func.least(
+            CollectorAlbum.collector_album_distinct_stickers_owned * 100.0 / total_stickers,
+            100
+        ) if total_stickers > 0 else 0
+    )
+    db.query(CollectorAlbum).filter(
+        CollectorAlbum.album_id == album_id
+    ).update({
+        CollectorAlbum.collector_album_completion_percentage: percentage,
+        CollectorAlbum.collector_album_completion:
+            func.concat(func.floor(percentage).cast(Integer), "%")
+    }, synchronize_session=False)
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+from sqlalchemy.orm import Session
+
+from ..models import (
+    Album, Sticker, Card, Pack, Box, Memorabilia, CollectorAlbum, CollectorSticker,
+    CollectorCard, CollectorPack, CollectorBox, CollectorMemorabilia
+)
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+# Encoded output is flushed to the client once it grows past this many characters
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Columns of an exported row; sections leave the ones they lack empty
+EXPORT_FIELDS = (
+    "section", "id", "item_id", "name", "number", "edition", "quantity",
+    "condition", "is_duplicate", "is_sealed", "completion"
+)
+
+def _collection_queries(db: Session, collector_id: int):
+    """Yield (section, query) for each part of a collector's collection"""
+    yield "albums", db.query(
+        CollectorAlbum.id,
+        CollectorAlbum.album_id.label("item_id"),
+        Album.album_title.label("name"),
+        Album.album_edition.label("edition"),
+        CollectorAlbum.collector_album_total_stickers_owned.label("quantity"),
+        CollectorAlbum.collector_album_completion.label("completion")
+    ).join(Album, CollectorAlbum.album_id == Album.id).filter(
+        CollectorAlbum.collector_id == collector_id
+    ).order_by(CollectorAlbum.id)
+
+    yield "stickers", db.query(
+        CollectorSticker.id,
+        CollectorSticker.sticker_id.label("item_id"),
+        Sticker.sticker_name.label("name"),
+        Sticker.sticker_number.label("number"),
+        Sticker.sticker_edition.label("edition"),
+        CollectorSticker.collector_stickers_quantity.label("quantity"),
+        CollectorSticker.collector_stickers_condition.label("condition"),
+        CollectorSticker.collector_stickers_is_duplicate.label("is_duplicate")
+    ).join(
+        CollectorAlbum, CollectorSticker.collector_album_id == CollectorAlbum.id
+    ).join(Sticker, CollectorSticker.sticker_id == Sticker.id).filter(
+        CollectorAlbum.collector_id == collector_id
+    ).order_by(CollectorSticker.id)
+
+    yield "cards", db.query(
+        CollectorCard.id,
+        CollectorCard.card_id.label("item_id"),
+        Card.card_player_name.label("name"),
+        Card.card_number.label("number"),
+        Card.card_edition.label("edition"),
+        CollectorCard.collector_card_quantity.label("quantity"),
+        CollectorCard.collector_card_condition.label("condition"),
+        CollectorCard.collector_card_is_duplicate.label("is_duplicate")
+    ).join(Card, CollectorCard.card_id == Card.id).filter(
+        CollectorCard.collector_id == collector_id
+    ).order_by(CollectorCard.id)
+
+    yield "packs", db.query(
+        CollectorPack.id,
+        CollectorPack.pack_id.label("item_id"),
+        Pack.pack_publisher.label("name"),
+        Pack.pack_edition.label("edition"),
+        CollectorPack.collector_pack_quantity.label("quantity"),
+        CollectorPack.collector_pack_condition.label("condition"),
+        CollectorPack.collector_pack_is_sealed.label("is_sealed")
+    ).join(Pack, CollectorPack.pack_id == Pack.id).filter(
+        CollectorPack.collector_id == collector_id
+    ).order_by(CollectorPack.id)
+
+    yield "boxes", db.query(
+        CollectorBox.id,
+        CollectorBox.box_id.label("item_id"),
+        Box.box_publisher.label("name"),
+        Box.box_edition.label("edition"),
+        CollectorBox.collector_box_quantity.label("quantity"),
+        CollectorBox.collector_box_condition.label("condition"),
+        CollectorBox.collector_box_is_sealed.label("is_sealed")
+    ).join(Box, CollectorBox.box_id == Box.id).filter(
+        CollectorBox.collector_id == collector_id
+    ).order_by(CollectorBox.id)
+
+    yield "memorabilia", db.query(
+        CollectorMemorabilia.id,
+        CollectorMemorabilia.memorabilia_id.label("item_id"),
+        Memorabilia.memorabilia_type.label("name"),
+        CollectorMemorabilia.collector_memorabilia_quantity.label("quantity"),
+        CollectorMemorabilia.collector_memorabilia_condition.label("condition"),
+        CollectorMemorabilia.collector_memorabilia_is_sealed.label("is_sealed")
+    ).join(Memorabilia, CollectorMemorabilia.memorabilia_id == Memorabilia.id).filter(
+        CollectorMemorabilia.collector_id == collector_id
+    ).order_by(CollectorMemorabilia.id)
+
+def iter_collection(db: Session, collector_id: int) -> Iterator[dict]:
+    """Yield every item a collector owns as a flat row of EXPORT_FIELDS.
+
+    Each section is read through a server-side cursor in batches, so memory
+    use does not grow with the size of the collection.
+    """
+    empty = dict.fromkeys(EXPORT_FIELDS)
+    for section, query in _collection_queries(db, collector_id):
+        for row in query.yield_per(EXPORT_BATCH_SIZE):
+            yield {**empty, **row._asdict(), "section": section}
+
+def _chunked(lines: Iterable[str]) -> Iterator[str]:
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+def ndjson_export(rows: Iterable[dict]) -> Iterator[str]:
+    """Encode rows as newline-delimited JSON, one object per line"""
+    return _chunked(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+
+def _csv_lines(rows: Iterable[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def csv_export(rows: Iterable[dict]) -> Iterator[str]:
+    """Encode rows as CSV with a header row of EXPORT_FIELDS"""
+    return _chunked(_csv_lines(rows))
@@ -0,0 +1,100 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import IdempotencyKey
+
+class IdempotencyError(Exception):
+    """An Idempotency-Key that cannot be honored"""
+
+class IdempotencyKeyMismatch(IdempotencyError):
+    """The key was already used for a different request body"""
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a request body"""
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+def claim_idempotency_key(
+    db: Session,
+    key: str,
+    scope: str,
+    payload: Any
+) -> Optional[IdempotencyKey]:
+    """Claim a key in the caller's transaction, or return the request that already used it.
+
+    The claim row is inserted in the same transaction as the write it guards,
+    so a concurrent retry waits on the unique constraint until the first
+    attempt commits (and then sees its stored response) or rolls back (and
+    then claims the key itself). Expired keys are claimed again. Returns None
+    when the caller should perform the write.
+    """
+    fingerprint = request_fingerprint(payload)
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    stmt = insert(IdempotencyKey).values(
+        idempotency_key=key,
+        idempotency_key_scope=scope,
+        idempotency_key_fingerprint=fingerprint,
+        idempotency_key_expires_at=expires_at
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["idempotency_key", "idempotency_key_scope"],
+        set_={
+            "idempotency_key_fingerprint": stmt.excluded.idempotency_key_fingerprint,
+            "idempotency_key_status_code": None,
+            "idempotency_key_response": None,
+            "idempotency_key_expires_at": stmt.excluded.idempotency_key_expires_at,
+            "updated_at": func.now(),
+        },
+        where=IdempotencyKey.idempotency_key_expires_at <= func.now()
+    ).returning(IdempotencyKey.id)
+    if db.execute(stmt).first() is not None:
+        return None
+
+    stored = db.query(IdempotencyKey).filter(
+        IdempotencyKey.idempotency_key == key,
+        IdempotencyKey.idempotency_key_scope == scope
+    ).first()
+    if stored.idempotency_key_fingerprint != fingerprint:
+        raise IdempotencyKeyMismatch("Idempotency-Key was already used for a different request")
+    if stored.idempotency_key_status_code is None:
+        raise IdempotencyError("Idempotency-Key has no stored response")
+    return stored
+
+def store_idempotent_response(
+    db: Session,
+    key: str,
+    scope: str,
+    status_code: int,
+    response: Any
+) -> None:
+    """Store the response for a claimed key, to be committed with the write"""
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.idempotency_key == key,
+        IdempotencyKey.idempotency_key_scope == scope
+    ).update({
+        IdempotencyKey.idempotency_key_status_code: status_code,
+        IdempotencyKey.idempotency_key_response: jsonable_encoder(response),
+        IdempotencyKey.updated_at: func.now()
+    }, synchronize_session=False)
+
+def purge_expired_idempotency_keys(db: Session, chunk_size: int = 1000) -> int:
+    """Delete expired keys in chunks, committing after each, and return how many went"""
+    purged = 0
+    while True:
+        expired = select(IdempotencyKey.id).where(
+            IdempotencyKey.idempotency_key_expires_at < func.now()
+        ).limit(chunk_size).scalar_subquery()
+        deleted = db.query(IdempotencyKey).filter(
+            IdempotencyKey.id.in_(expired)
+        ).delete(synchronize_session=False)
+        db.commit()
+        purged += deleted
+        if deleted < chunk_size:
+            return purged
@@ -0,0 +1,417 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, case, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import (
+    CompanyInventory, InventoryMovement, InventoryBalanceSnapshot,
+    MovementTypes, TradeRequest, TradeItem, Sticker, Card, Pack, Box, Memorabilia
+)
+from .trade_statistics import record_movement_volume, record_stock_change
+
+class InventoryError(Exception):
+    """A movement that cannot be applied to company inventory"""
+
+class InventoryNotFound(InventoryError):
+    """The inventory row does not exist"""
+
+class InsufficientInventory(InventoryError):
+    """The movement would drive a quantity below zero"""
+
+# Catalog model behind each inventory item type
+INVENTORY_ITEM_MODELS = {
+    "sticker": Sticker,
+    "card": Card,
+    "pack": Pack,
+    "box": Box,
+    "memorabilia": Memorabilia,
+}
+
+# Units added to (available, allocated) per unit moved
+MOVEMENT_EFFECTS = {
+    MovementTypes.RECEIVED: (1, 0),
+    MovementTypes.RETURNED: (1, 0),
+    MovementTypes.ALLOCATED: (-1, 1),
+    MovementTypes.RELEASED: (1, -1),
+    MovementTypes.SHIPPED: (-1, 0),
+    MovementTypes.ADJUSTED: (1, 0),
+}
+
+def resolve_inventory_items(
+    db: Session,
+    inventory: Sequence[CompanyInventory]
+) -> Dict[Tuple[str, int], dict]:
+    """Fetch the catalog rows behind inventory rows, one IN query per item type.
+
+    Returns the catalog columns keyed by (item type, item id); items of an
+    unknown type or that no longer exist are left out.
+    """
+    ids_by_type = defaultdict(set)
+    for item in inventory:
+        ids_by_type[item.company_inventory_item_type].add(item.company_inventory_item_id)
+
+    resolved = {}
+    for item_type, item_ids in ids_by_type.items():
+        model = INVENTORY_ITEM_MODELS.get(item_type)
+        if model is None:
+            continue
+        columns = [
+            column for column in model.__table__.columns
+            if column.name not in ("created_at", "updated_at")
+        ]
+        for row in db.query(*columns).filter(model.id.in_(item_ids)):
+            resolved[(item_type, row.id)] = dict(row._mapping)
+    return resolved
+
+def movement_deltas(
+    movement_type: str,
+    quantity: int,
+    trade_request_id: Optional[int] = None
+) -> Tuple[int, int]:
+    """Changes to the available and allocated quantities for a movement"""
+    if movement_type not in MOVEMENT_EFFECTS:
+        raise InventoryError(f"Unknown movement type: {movement_type}")
+    # Adjustments carry their sign, every other movement moves a positive quantity
+    if movement_type == MovementTypes.ADJUSTED:
+        if quantity == 0:
+            raise InventoryError("Adjustment quantity must not be zero")
+    elif quantity <= 0:
+        raise InventoryError("Movement quantity must be positive")
+
+    # Trades ship the stock that was allocated to them
+    if movement_type == MovementTypes.SHIPPED and trade_request_id is not None:
+        return 0, -quantity
+
+    available, allocated = MOVEMENT_EFFECTS[movement_type]
+    return available * quantity, allocated * quantity
+
+def apply_movement(
+    db: Session,
+    inventory_id: int,
+    movement_type: str,
+    quantity: int,
+    trade_request_id: Optional[int] = None
+):
+    """Apply a movement to an inventory row in one conditional UPDATE.
+
+    The quantities are changed in the database rather than in Python, and the
+    WHERE clause rejects any change that would overdraw them, so concurrent
+    movements can neither lose updates nor drive stock negative. Changes to
+    the units held are added to the stock counter. Returns the item type,
+    item id and new quantities of the row.
+    """
+    available_delta, allocated_delta = movement_deltas(movement_type, quantity, trade_request_id)
+    available = CompanyInventory.company_inventory_quantity_available
+    allocated = CompanyInventory.company_inventory_quantity_allocated
+
+    stmt = update(CompanyInventory).where(CompanyInventory.id == inventory_id)
+    if available_delta < 0:
+        stmt = stmt.where(available >= -available_delta)
+    if allocated_delta < 0:
+        stmt = stmt.where(allocated >= -allocated_delta)
+    stmt = stmt.values({
+        available: available + available_delta,
+        allocated: allocated + allocated_delta,
+        CompanyInventory.company_inventory_updated_at: func.now()
+    }).returning(
+        CompanyInventory.company_inventory_item_type,
+        CompanyInventory.company_inventory_item_id,
+        available,
+        allocated
+    ).execution_options(synchronize_session=False)
+
+    row = db.execute(stmt).first()
+    if row is None:
+        if not db.query(CompanyInventory.id).filter(CompanyInventory.id == inventory_id).first():
+            raise InventoryNotFound("Inventory item not found")
+        raise InsufficientInventory(f"Insufficient inventory for {movement_type} of {quantity}")
+    if available_delta + allocated_delta:
+        record_stock_change(db, available_delta + allocated_delta)
+    return row
+
+def record_movement(
+    db: Session,
+    inventory_id: int,
+    movement_type: str,
+    quantity: int,
+    trade_request_id: Optional[int] = None
+):
+    """Apply a movement and add it to the ledger, returning the movement and the updated row"""
+    row = apply_movement(db, inventory_id, movement_type, quantity, trade_request_id)
+    movement = InventoryMovement(
+        inventory_id=inventory_id,
+        inventory_movement_type=movement_type,
+        inventory_movement_quantity=quantity,
+        trade_request_id=trade_request_id
+    )
+    db.add(movement)
+    db.flush()
+    record_movement_volume(
+        db,
+        movement_type,
+        quantity,
+        item_type=row.company_inventory_item_type,
+        item_id=row.company_inventory_item_id,
+        trade_request_id=trade_request_id
+    )
+    return movement, row
+
+def reserve_trade_request(db: Session, trade_request: TradeRequest) -> List[int]:
+    """Allocate the stock for every outgoing item of a trade, all or nothing.
+
+    The inventory rows are checked and locked in a single query, in id order
+    so concurrent reservations cannot deadlock, then allocated with one
+    UPDATE and recorded with one multi-row INSERT. Raises before changing
+    anything if any item is short. Returns the ids of the reserved rows.
+    """
+    items = db.query(TradeItem.inventory_id, TradeItem.trade_item_quantity).filter(
+        TradeItem.trade_request_id == trade_request.id,
+        TradeItem.trade_item_is_incoming.is_(False)
+    ).all()
+    if not items:
+        raise InventoryError("Trade request has no outgoing items")
+    if any(inventory_id is None for inventory_id, _ in items):
+        raise InventoryError("Every outgoing item needs an inventory_id to be reserved")
+
+    needed = Counter()
+    for inventory_id, quantity in items:
+        needed[inventory_id] += quantity
+
+    available = dict(
+        db.query(CompanyInventory.id, CompanyInventory.company_inventory_quantity_available)
+        .filter(CompanyInventory.id.in_(needed))
+        .order_by(CompanyInventory.id)
+        .with_for_update()
+        .all()
+    )
+    missing = sorted(set(needed) - set(available))
+    if missing:
+        raise InventoryNotFound(f"Inventory items not found: {missing}")
+    short = sorted(
+        inventory_id for inventory_id, quantity in needed.items()
+        if available[inventory_id] < quantity
+    )
+    if short:
+        raise InsufficientInventory(f"Insufficient inventory for items: {short}")
+
+    quantity = case(needed, value=CompanyInventory.id)
+    db.execute(
+        update(CompanyInventory)
+        .where(CompanyInventory.id.in_(needed))
+        .values({
+            CompanyInventory.company_inventory_quantity_available:
+                CompanyInventory.company_inventory_quantity_available - quantity,
+            CompanyInventory.company_inventory_quantity_allocated:
+                CompanyInventory.company_inventory_quantity_allocated + quantity,
+            CompanyInventory.company_inventory_updated_at: func.now()
+        })
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(insert(InventoryMovement).values([
+        {
+            "inventory_id": inventory_id,
+            "inventory_movement_type": MovementTypes.ALLOCATED,
+            "inventory_movement_quantity": quantity,
+            "trade_request_id": trade_request.id
+        }
+        for inventory_id, quantity in sorted(needed.items())
+    ]))
+    record_movement_volume(
+        db,
+        MovementTypes.ALLOCATED,
+        sum(needed.values()),
+        movements=len(needed)
+    )
+    return sorted(needed)
+
+def settle_trade_request(db: Session, trade_request: TradeRequest, movement_type: str) -> list:
+    """Ship or release the stock still allocated to a trade, per the ledger.
+
+    What remains allocated is what the trade's allocations left after its
+    releases and shipments, so stock moved by hand is not moved twice. Each
+    item is recorded with ``record_movement`` in id order, in the caller's
+    transaction. Returns the (movement, updated row) pairs recorded.
+    """
+    if movement_type not in (MovementTypes.RELEASED, MovementTypes.SHIPPED):
+        raise InventoryError(f"Trades cannot be settled by {movement_type}")
+
+    movement = InventoryMovement.inventory_movement_type
+    quantity = InventoryMovement.inventory_movement_quantity
+    allocated = func.sum(case(
+        (movement == MovementTypes.ALLOCATED, quantity),
+        (movement.in_([MovementTypes.RELEASED, MovementTypes.SHIPPED]), -quantity),
+        else_=0
+    ))
+    remaining = db.query(InventoryMovement.inventory_id, allocated).filter(
+        InventoryMovement.trade_request_id == trade_request.id
+    ).group_by(InventoryMovement.inventory_id).order_by(InventoryMovement.inventory_id).all()
+
+    return [
+        record_movement(db, inventory_id, movement_type, quantity, trade_request.id)
+        for inventory_id, quantity in remaining
+        if quantity > 0
+    ]
+
+def _ledger_delta(index: int):
+    """SQL expression for a movement's change to available (0) or allocated (1)"""
+    movement_type = InventoryMovement.inventory_movement_type
+    quantity = InventoryMovement.inventory_movement_quantity
+    # Mirrors movement_deltas: trade shipments consume allocated stock
+    whens = [(
+        and_(
+            movement_type == MovementTypes.SHIPPED,
+            InventoryMovement.trade_request_id.isnot(None)
+        ),
+        -quantity if index else 0
+    )]
+    whens.extend(
+        (movement_type == name, quantity * effects[index])
+        for name, effects in MOVEMENT_EFFECTS.items()
+        if effects[index]
+    )
+    return case(*whens, else_=0)
+
+def _latest_snapshots(inventory_ids: Sequence[int], at: Optional[datetime] = None):
+    """Subquery of the latest snapshot per inventory item, taken no later than at"""
+    latest = select(
+        InventoryBalanceSnapshot.inventory_id,
+        func.max(InventoryBalanceSnapshot.inventory_balance_snapshot_taken_at).label("taken_at")
+    ).where(InventoryBalanceSnapshot.inventory_id.in_(inventory_ids))
+    if at is not None:
+        latest = latest.where(InventoryBalanceSnapshot.inventory_balance_snapshot_taken_at <= at)
+    latest = latest.group_by(InventoryBalanceSnapshot.inventory_id).subquery()
+
+    return select(
+        InventoryBalanceSnapshot.inventory_id,
+        InventoryBalanceSnapshot.inventory_balance_snapshot_available.label("available"),
+        InventoryBalanceSnapshot.inventory_balance_snapshot_allocated.label("allocated"),
+        InventoryBalanceSnapshot.inventory_balance_snapshot_taken_at.label("taken_at")
+    ).join(
+        latest,
+        and_(
+            latest.c.inventory_id == InventoryBalanceSnapshot.inventory_id,
+            latest.c.taken_at == InventoryBalanceSnapshot.inventory_balance_snapshot_taken_at
+        )
+    ).subquery()
+
+def ledger_balances(inventory_ids: Sequence[int], at: Optional[datetime] = None):
+    """Select each item's balance from its latest snapshot plus the movements since.
+
+    Yields (inventory_id, available, allocated, snapshot_taken_at, movements)
+    for every id in inventory_ids, as of ``at`` or including the whole ledger.
+    """
+    snapshots = _latest_snapshots(inventory_ids, at)
+    folded = select(
+        InventoryMovement.inventory_id,
+        func.sum(_ledger_delta(0)).label("available"),
+        func.sum(_ledger_delta(1)).label("allocated"),
+        func.count(InventoryMovement.id).label("movements")
+    ).outerjoin(
+        snapshots, snapshots.c.inventory_id == InventoryMovement.inventory_id
+    ).where(
+        InventoryMovement.inventory_id.in_(inventory_ids),
+        or_(
+            snapshots.c.taken_at.is_(None),
+            InventoryMovement.inventory_movement_created_at > snapshots.c.taken_at
+        )
+    )
+    if at is not None:
+        folded = folded.where(InventoryMovement.inventory_movement_created_at <= at)
+    folded = folded.group_by(InventoryMovement.inventory_id).subquery()
+
+    return select(
+        CompanyInventory.id.label("inventory_id"),
+        (func.coalesce(snapshots.c.available, 0) + func.coalesce(folded.c.available, 0)).label("available"),
+        (func.coalesce(snapshots.c.allocated, 0) + func.coalesce(folded.c.allocated, 0)).label("allocated"),
+        snapshots.c.taken_at.label("snapshot_taken_at"),
+        func.coalesce(folded.c.movements, 0).label("movements")
+    ).outerjoin(
+        snapshots, snapshots.c.inventory_id == CompanyInventory.id
+    ).outerjoin(
+        folded, folded.c.inventory_id == CompanyInventory.id
+    ).where(CompanyInventory.id.in_(inventory_ids))
+
+def inventory_balance(db: Session, inventory_id: int, at: Optional[datetime] = None):
+    """An item's balance as of a point in time, None for an unknown item"""
+    return db.execute(ledger_balances([inventory_id], at)).first()
+
+def _inventory_id_chunks(db: Session, chunk_size: int):
+    """Yield inventory ids in ascending chunks using keyset pagination"""
+    last_id = 0
+    while True:
+        ids = [
+            inventory_id for inventory_id, in db.query(CompanyInventory.id)
+            .filter(CompanyInventory.id > last_id)
+            .order_by(CompanyInventory.id)
+            .limit(chunk_size)
+        ]
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+def snapshot_inventory_balances(db: Session, chunk_size: int = 500) -> int:
+    """Snapshot every item's ledger balance, committing after each chunk.
+
+    Snapshots cover movements older than INVENTORY_SNAPSHOT_LAG_SECONDS so
+    that movements still being committed are folded in later rather than
+    skipped. Returns the number of snapshots written.
+    """
+    taken_at = db.query(func.now()).scalar().replace(tzinfo=None) - timedelta(
+        seconds=settings.INVENTORY_SNAPSHOT_LAG_SECONDS
+    )
+    written = 0
+    for ids in _inventory_id_chunks(db, chunk_size):
+        rows = [
+            {
+                "inventory_id": row.inventory_id,
+                "inventory_balance_snapshot_available": row.available,
+                "inventory_balance_snapshot_allocated": row.allocated,
+                "inventory_balance_snapshot_taken_at": taken_at
+            }
+            for row in db.execute(ledger_balances(ids, taken_at))
+            # Nothing to record for items untouched since their last snapshot
+            if row.movements or row.snapshot_taken_at is None
+        ]
+        if rows:
+            db.execute(insert(InventoryBalanceSnapshot).values(rows))
+        db.commit()
+        written += len(rows)
+    return written
+
+def reconcile_inventory(db: Session, chunk_size: int = 500) -> List[dict]:
+    """Compare inventory counters with the ledger, one chunk at a time.
+
+    Each chunk is read in a single statement, so counters and ledger come
+    from the same point in time without locking. Returns the mismatches.
+    """
+    mismatches = []
+    for ids in _inventory_id_chunks(db, chunk_size):
+        ledger = ledger_balances(ids).subquery()
+        rows = db.query(
+            CompanyInventory.id,
+            CompanyInventory.company_inventory_quantity_available,
+            CompanyInventory.company_inventory_quantity_allocated,
+            ledger.c.available,
+            ledger.c.allocated
+        ).join(ledger, ledger.c.inventory_id == CompanyInventory.id).filter(
+            or_(
+                CompanyInventory.company_inventory_quantity_available != ledger.c.available,
+                CompanyInventory.company_inventory_quantity_allocated != ledger.c.allocated
+            )
+        ).all()
+        mismatches.extend(
+            {
+                "inventory_id": inventory_id,
+                "available": available,
+                "allocated": allocated,
+                "ledger_available": ledger_available,
+                "ledger_allocated": ledger_allocated
+            }
+            for inventory_id, available, allocated, ledger_available, ledger_allocated in rows
+        )
+        # End the read transaction between chunks
+        db.rollback()
+    return mismatches
@@ -0,0 +1,313 @@
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from sqlalchemy import event, func, distinct, case, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.cache import cache, cached
+from ..core.config import settings
+from ..db.session import primary_session
+from ..models import (
+    Album, Card, Collector, CollectorAlbum, CollectorCard, CollectorSticker,
+    CollectorPack, CollectorBox, CollectorMemorabilia, Sticker, Pack, Box, Memorabilia,
+    TradeRequest, CompetitionStatistics, CompetitionTradingVolume, MovementTypes,
+    TradeStatusTypes
+)
+
+# Cache namespaces for aggregate endpoints, invalidated by the write paths
+COMPETITION_STATISTICS_CACHE = "competition-statistics"
+COMPETITION_TRADING_VOLUME_CACHE = "competition-trading-volume"
+COLLECTOR_STATISTICS_CACHE = "collector-statistics"
+
+# Ledger movements that move a collectible between a collector and the company
+TRADING_VOLUME_MOVEMENT_TYPES = (MovementTypes.SHIPPED, MovementTypes.RECEIVED)
+
+# Inventory item types whose catalog rows hang off an album
+ALBUM_ITEM_MODELS = {
+    "sticker": Sticker,
+    "pack": Pack,
+    "box": Box,
+    "memorabilia": Memorabilia,
+}
+
+# Session.info key holding the cache entries to drop once the session commits
+PENDING_INVALIDATIONS = "pending_cache_invalidations"
+
+def invalidate_after_commit(db: Session, namespace: str, *parts) -> None:
+    """Drop a cache entry once db commits.
+
+    Invalidating before the commit would let a concurrent read re-cache the
+    pre-commit state for the whole TTL.
+    """
+    db.info.setdefault(PENDING_INVALIDATIONS, set()).add((namespace, *parts))
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session: Session) -> None:
+    for namespace, *parts in session.info.pop(PENDING_INVALIDATIONS, ()):
+        cache.invalidate(namespace, *parts)
+
+def _competition_statistics_values(db: Session, competition_id: int) -> dict:
+    """Compute a competition's statistics from the live tables"""
+    total_albums, total_cards = db.query(
+        select(func.count(Album.id)).where(
+            Album.competition_id == competition_id
+        ).scalar_subquery(),
+        select(func.count(Card.id)).where(
+            Card.competition_id == competition_id
+        ).scalar_subquery()
+    ).one()
+
+    completion = CollectorAlbum.collector_album_completion_percentage
+    total_collectors, completed_albums, average_completion = db.query(
+        func.count(distinct(CollectorAlbum.collector_id)),
+        func.coalesce(func.sum(case((completion >= 100, 1), else_=0)), 0),
+        func.coalesce(func.avg(completion), 0)
+    ).join(Album).filter(
+        Album.competition_id == competition_id
+    ).one()
+
+    most_collected_albums = db.query(
+        Album.id,
+        Album.album_title,
+        func.count(CollectorAlbum.id).label('collectors')
+    ).join(CollectorAlbum).filter(
+        Album.competition_id == competition_id
+    ).group_by(Album.id).order_by(
+        func.count(CollectorAlbum.id).desc()
+    ).limit(5).all()
+
+    trading_volume = db.query(
+        func.coalesce(func.sum(CompetitionTradingVolume.competition_trading_volume_quantity), 0)
+    ).filter(
+        CompetitionTradingVolume.competition_id == competition_id
+    ).scalar()
+
+    most_collected_cards = db.query(
+        Card.id,
+        Card.card_player_name,
+        func.count(CollectorCard.id).label('collectors')
+    ).join(CollectorCard).filter(
+        Card.competition_id == competition_id
+    ).group_by(Card.id).order_by(
+        func.count(CollectorCard.id).desc()
+    ).limit(5).all()
+
+    return {
+        "competition_statistics_total_albums": total_albums,
+        "competition_statistics_total_cards": total_cards,
+        "competition_statistics_total_collectors": total_collectors,
+        "competition_statistics_completion_rate": (
+            completed_albums / total_collectors if total_collectors > 0 else 0
+        ),
+        "competition_statistics_average_completion": float(average_completion),
+        "competition_statistics_most_collected_albums": [
+            {"id": album_id, "name": title, "collectors": collectors}
+            for album_id, title, collectors in most_collected_albums
+        ],
+        "competition_statistics_most_collected_cards": [
+            {"id": card_id, "name": player_name, "collectors": collectors}
+            for card_id, player_name, collectors in most_collected_cards
+        ],
+        "competition_statistics_trading_volume": trading_volume,
+    }
+
+def refresh_competition_statistics(db: Session, competition_id: int) -> CompetitionStatistics:
+    """Recompute and store the statistics rollup for a competition"""
+    values = _competition_statistics_values(db, competition_id)
+    values.update({
+        "competition_statistics_is_stale": False,
+        "competition_statistics_refreshed_at": datetime.now(timezone.utc),
+        "updated_at": func.now(),
+    })
+
+    stmt = insert(CompetitionStatistics).values(competition_id=competition_id, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=["competition_id"], set_=values)
+    db.execute(stmt)
+    invalidate_after_commit(db, COMPETITION_STATISTICS_CACHE, competition_id)
+
+    return db.query(CompetitionStatistics).filter(
+        CompetitionStatistics.competition_id == competition_id
+    ).populate_existing().one()
+
+def mark_competition_statistics_stale(db: Session, competition_id: int) -> None:
+    """Flag a competition's rollup for recomputation after a write"""
+    db.query(CompetitionStatistics).filter(
+        CompetitionStatistics.competition_id == competition_id,
+        CompetitionStatistics.competition_statistics_is_stale.is_(False)
+    ).update(
+        {CompetitionStatistics.competition_statistics_is_stale: True},
+        synchronize_session=False
+    )
+    invalidate_after_commit(db, COMPETITION_STATISTICS_CACHE, competition_id)
+
+def get_competition_statistics(db: Session, competition_id: int) -> CompetitionStatistics:
+    """Read a competition's rollup, recomputing it when missing or too stale"""
+    statistics = db.query(CompetitionStatistics).filter(
+        CompetitionStatistics.competition_id == competition_id
+    ).first()
+
+    if statistics is None or (
+        statistics.competition_statistics_is_stale
+        and snapshot_age_seconds(statistics.competition_statistics_refreshed_at)
+        > settings.STATISTICS_MAX_AGE_SECONDS
+    ):
+        # GET requests may be reading from the replica, so refresh on the primary
+        with primary_session(db) as primary:
+            statistics = refresh_competition_statistics(primary, competition_id)
+            primary.commit()
+            primary.refresh(statistics)
+    return statistics
+
+@cached(COMPETITION_STATISTICS_CACHE, key=("competition_id",), ttl=settings.STATISTICS_MAX_AGE_SECONDS)
+def competition_statistics_snapshot(db: Session, competition_id: int) -> dict:
+    """Competition statistics as served by the API, for a competition known to exist.
+
+    Callers check the competition first: a cached 404 would outlive the
+    competition being created.
+    """
+    statistics = get_competition_statistics(db, competition_id)
+    return {
+        "total_albums": statistics.competition_statistics_total_albums,
+        "total_cards": statistics.competition_statistics_total_cards,
+        "total_collectors": statistics.competition_statistics_total_collectors,
+        "completion_rate": statistics.competition_statistics_completion_rate,
+        "most_collected_albums": statistics.competition_statistics_most_collected_albums,
+        "most_collected_cards": statistics.competition_statistics_most_collected_cards,
+        "trading_volume": statistics.competition_statistics_trading_volume,
+        "average_collection_completion": statistics.competition_statistics_average_completion,
+        "refreshed_at": statistics.competition_statistics_refreshed_at
+    }
+
+def snapshot_age_seconds(refreshed_at: datetime) -> float:
+    """Seconds elapsed since a rollup was last recomputed"""
+    if refreshed_at.tzinfo is None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+
+def refresh_stale_competition_statistics(db: Session) -> List[int]:
+    """Recompute every stale rollup, committing after each competition"""
+    competition_ids = [
+        competition_id for competition_id, in db.query(
+            CompetitionStatistics.competition_id
+        ).filter(
+            CompetitionStatistics.competition_statistics_is_stale.is_(True)
+        ).all()
+    ]
+    for competition_id in competition_ids:
+        refresh_competition_statistics(db, competition_id)
+        db.commit()
+    return competition_ids
+
+def item_competition_id(db: Session, item_type: str, item_id: int) -> Optional[int]:
+    """Resolve the competition a collectible belongs to"""
+    if item_type == "card":
+        return db.query(Card.competition_id).filter(Card.id == item_id).scalar()
+
+    model = ALBUM_ITEM_MODELS.get(item_type)
+    if model is None:
+        return None
+    return db.query(Album.competition_id).join(
+        model, model.album_id == Album.id
+    ).filter(model.id == item_id).scalar()
+
+def record_trading_volume(db: Session, competition_id: int, quantity: int) -> None:
+    """Add a trade movement to today's trading volume bucket"""
+    stmt = insert(CompetitionTradingVolume).values(
+        competition_id=competition_id,
+        competition_trading_volume_date=func.current_date(),
+        competition_trading_volume_quantity=quantity,
+        competition_trading_volume_movements=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["competition_id", "competition_trading_volume_date"],
+        set_={
+            "competition_trading_volume_quantity":
+                CompetitionTradingVolume.competition_trading_volume_quantity
+                + stmt.excluded.competition_trading_volume_quantity,
+            "competition_trading_volume_movements":
+                CompetitionTradingVolume.competition_trading_volume_movements + 1,
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+    invalidate_after_commit(db, COMPETITION_TRADING_VOLUME_CACHE, competition_id)
+
+def get_trading_volume(
+    db: Session,
+    competition_id: int,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None
+) -> List[CompetitionTradingVolume]:
+    """Daily trading volume buckets for a competition, oldest first"""
+    query = db.query(CompetitionTradingVolume).filter(
+        CompetitionTradingVolume.competition_id == competition_id
+    )
+    if from_date:
+        query = query.filter(CompetitionTradingVolume.competition_trading_volume_date >= from_date)
+    if to_date:
+        query = query.filter(CompetitionTradingVolume.competition_trading_volume_date <= to_date)
+    return query.order_by(CompetitionTradingVolume.competition_trading_volume_date).all()
+
+def _collector_scalar(column, *criteria):
+    return select(column).where(*criteria).scalar_subquery()
+
+def collector_statistics(db: Session, collector_id: int) -> Optional[dict]:
+    """Compute a collector's statistics in a single query, None if no such collector"""
+    def total_quantity(model, quantity):
+        return _collector_scalar(
+            func.coalesce(func.sum(quantity), 0),
+            model.collector_id == Collector.id
+        )
+
+    row = db.query(
+        _collector_scalar(
+            func.count(CollectorAlbum.id),
+            CollectorAlbum.collector_id == Collector.id
+        ).label("total_albums"),
+        _collector_scalar(
+            func.count(CollectorAlbum.id),
+            CollectorAlbum.collector_id == Collector.id,
+            CollectorAlbum.collector_album_completion_percentage >= 100
+        ).label("completed_albums"),
+        total_quantity(CollectorCard, CollectorCard.collector_card_quantity).label("total_cards"),
+        _collector_scalar(
+            func.coalesce(func.sum(CollectorSticker.collector_stickers_quantity), 0),
+            CollectorSticker.collector_album_id == CollectorAlbum.id,
+            CollectorAlbum.collector_id == Collector.id
+        ).label("total_stickers"),
+        total_quantity(CollectorPack, CollectorPack.collector_pack_quantity).label("total_packs"),
+        total_quantity(CollectorBox, CollectorBox.collector_box_quantity).label("total_boxes"),
+        total_quantity(
+            CollectorMemorabilia, CollectorMemorabilia.collector_memorabilia_quantity
+        ).label("total_memorabilia"),
+        _collector_scalar(
+            func.count(TradeRequest.id),
+            TradeRequest.collector_id == Collector.id
+        ).label("total_trades"),
+        _collector_scalar(
+            func.count(TradeRequest.id),
+            TradeRequest.collector_id == Collector.id,
+            TradeRequest.trade_requests_status == TradeStatusTypes.COMPLETED
+        ).label("successful_trades")
+    ).filter(Collector.id == collector_id).first()
+
+    if row is None:
+        return None
+
+    statistics = dict(row._mapping)
+    total_albums = statistics["total_albums"]
+    total_trades = statistics["total_trades"]
+    statistics["completion_rate"] = (
+        statistics["completed_albums"] / total_albums * 100 if total_albums > 0 else 0
+    )
+    statistics["trade_success_rate"] = (
+        statistics["successful_trades"] / total_trades * 100 if total_trades > 0 else 0
+    )
+    return statistics
+
+def invalidate_collector_statistics(collector_id: Optional[int] = None) -> None:
+    """Drop cached statistics for a collector, or for every collector"""
+    if collector_id is None:
+        cache.invalidate(COLLECTOR_STATISTICS_CACHE)
+    else:
+        cache.invalidate(COLLECTOR_STATISTICS_CACHE, collector_id)
@@ -0,0 +1,221 @@
+import random
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models import (
+    CompanyInventory, TradeRequest, TradeStatusCount, TradeItemVolume,
+    InventoryMovementVolume, InventoryStockCount, MovementTypes, TradeStatusTypes
+)
+from .statistics import TRADING_VOLUME_MOVEMENT_TYPES
+
+# Number of items listed under most traded and low stock
+TRADE_STATISTICS_TOP_ITEMS = 10
+
+def _trade_processing_seconds(db: Session, trade_request: TradeRequest) -> float:
+    now = db.query(func.now()).scalar()
+    return (
+        now.replace(tzinfo=None) - trade_request.trade_requests_created_at.replace(tzinfo=None)
+    ).total_seconds()
+
+def counter_shard() -> int:
+    """Shard a counter write lands in, spreading concurrent writes over rows"""
+    return random.randrange(settings.TRADE_STATISTICS_SHARDS)
+
+def _add_trade_status(db: Session, status: str, count: int, processing_seconds: float = 0.0) -> None:
+    stmt = insert(TradeStatusCount).values(
+        trade_status_counts_status=status,
+        trade_status_counts_shard=counter_shard(),
+        trade_status_counts_count=count,
+        trade_status_counts_processing_seconds=processing_seconds
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["trade_status_counts_status", "trade_status_counts_shard"],
+        set_={
+            "trade_status_counts_count":
+                TradeStatusCount.trade_status_counts_count + stmt.excluded.trade_status_counts_count,
+            "trade_status_counts_processing_seconds":
+                TradeStatusCount.trade_status_counts_processing_seconds
+                + stmt.excluded.trade_status_counts_processing_seconds,
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+def record_trade_status(
+    db: Session,
+    trade_request: TradeRequest,
+    old_status: Optional[str],
+    new_status: str
+) -> None:
+    """Move a trade request between status counters, None old_status for a new request.
+
+    Each change lands in a random shard of its status, so a single shard may
+    count below zero; only the sum over a status's shards is meaningful.
+    """
+    if old_status == new_status:
+        return
+
+    processing_seconds = 0.0
+    if new_status == TradeStatusTypes.COMPLETED:
+        processing_seconds = _trade_processing_seconds(db, trade_request)
+
+    _add_trade_status(db, new_status, 1, processing_seconds)
+    if old_status is not None:
+        _add_trade_status(db, old_status, -1)
+
+def record_movement_volume(
+    db: Session,
+    movement_type: str,
+    quantity: int,
+    movements: int = 1,
+    item_type: Optional[str] = None,
+    item_id: Optional[int] = None,
+    trade_request_id: Optional[int] = None
+) -> None:
+    """Add movements to today's movement buckets, and to the item's bucket for trades"""
+    stmt = insert(InventoryMovementVolume).values(
+        inventory_movement_volume_date=func.current_date(),
+        inventory_movement_volume_type=movement_type,
+        inventory_movement_volume_shard=counter_shard(),
+        inventory_movement_volume_quantity=quantity,
+        inventory_movement_volume_movements=movements
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            "inventory_movement_volume_date",
+            "inventory_movement_volume_type",
+            "inventory_movement_volume_shard"
+        ],
+        set_={
+            "inventory_movement_volume_quantity":
+                InventoryMovementVolume.inventory_movement_volume_quantity
+                + stmt.excluded.inventory_movement_volume_quantity,
+            "inventory_movement_volume_movements":
+                InventoryMovementVolume.inventory_movement_volume_movements
+                + stmt.excluded.inventory_movement_volume_movements,
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+    if (
+        trade_request_id is None
+        or item_type is None
+        or movement_type not in TRADING_VOLUME_MOVEMENT_TYPES
+    ):
+        return
+
+    stmt = insert(TradeItemVolume).values(
+        trade_item_volume_date=func.current_date(),
+        trade_item_volume_item_type=item_type,
+        trade_item_volume_item_id=item_id,
+        trade_item_volume_shard=counter_shard(),
+        trade_item_volume_quantity=quantity,
+        trade_item_volume_movements=movements
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            "trade_item_volume_date",
+            "trade_item_volume_item_type",
+            "trade_item_volume_item_id",
+            "trade_item_volume_shard"
+        ],
+        set_={
+            "trade_item_volume_quantity":
+                TradeItemVolume.trade_item_volume_quantity
+                + stmt.excluded.trade_item_volume_quantity,
+            "trade_item_volume_movements":
+                TradeItemVolume.trade_item_volume_movements
+                + stmt.excluded.trade_item_volume_movements,
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+def record_stock_change(db: Session, quantity: int) -> None:
+    """Add a change in units held, available or allocated, to a stock counter shard"""
+    stmt = insert(InventoryStockCount).values(
+        inventory_stock_counts_shard=counter_shard(),
+        inventory_stock_counts_quantity=quantity
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["inventory_stock_counts_shard"],
+        set_={
+            "inventory_stock_counts_quantity":
+                InventoryStockCount.inventory_stock_counts_quantity
+                + stmt.excluded.inventory_stock_counts_quantity,
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+def trade_statistics(db: Session, days: int = 30) -> dict:
+    """Trading dashboard figures from the counters and the last days of buckets"""
+    counts = {
+        status: (count, processing_seconds)
+        for status, count, processing_seconds in db.query(
+            TradeStatusCount.trade_status_counts_status,
+            func.sum(TradeStatusCount.trade_status_counts_count),
+            func.sum(TradeStatusCount.trade_status_counts_processing_seconds)
+        ).group_by(TradeStatusCount.trade_status_counts_status)
+    }
+    total_trades = sum(count for count, _ in counts.values())
+    completed_trades, processing_seconds = counts.get(TradeStatusTypes.COMPLETED, (0, 0.0))
+
+    since = func.current_date() - timedelta(days=days - 1)
+    item_quantity = func.sum(TradeItemVolume.trade_item_volume_quantity)
+    most_traded = db.query(
+        TradeItemVolume.trade_item_volume_item_type,
+        TradeItemVolume.trade_item_volume_item_id,
+        item_quantity
+    ).filter(
+        TradeItemVolume.trade_item_volume_date >= since
+    ).group_by(
+        TradeItemVolume.trade_item_volume_item_type,
+        TradeItemVolume.trade_item_volume_item_id
+    ).order_by(item_quantity.desc()).limit(TRADE_STATISTICS_TOP_ITEMS).all()
+
+    volume_by_type = dict(
+        db.query(
+            TradeItemVolume.trade_item_volume_item_type,
+            func.sum(TradeItemVolume.trade_item_volume_quantity)
+        ).filter(
+            TradeItemVolume.trade_item_volume_date >= since
+        ).group_by(TradeItemVolume.trade_item_volume_item_type).all()
+    )
+
+    shipped = db.query(
+        func.coalesce(func.sum(InventoryMovementVolume.inventory_movement_volume_quantity), 0)
+    ).filter(
+        InventoryMovementVolume.inventory_movement_volume_date >= since,
+        InventoryMovementVolume.inventory_movement_volume_type == MovementTypes.SHIPPED
+    ).scalar()
+    stock = db.query(
+        func.coalesce(func.sum(InventoryStockCount.inventory_stock_counts_quantity), 0)
+    ).scalar()
+
+    low_stock_items = db.query(CompanyInventory).filter(
+        CompanyInventory.company_inventory_quantity_available <= settings.LOW_STOCK_THRESHOLD
+    ).order_by(
+        CompanyInventory.company_inventory_quantity_available,
+        CompanyInventory.id
+    ).limit(TRADE_STATISTICS_TOP_ITEMS).all()
+
+    return {
+        "total_trades": total_trades,
+        "pending_trades": counts.get(TradeStatusTypes.PENDING, (0, 0.0))[0],
+        "completed_trades": completed_trades,
+        "cancelled_trades": counts.get(TradeStatusTypes.CANCELLED, (0, 0.0))[0],
+        "average_processing_time": processing_seconds / completed_trades if completed_trades > 0 else 0,
+        "most_traded_items": {
+            f"{item_type}:{item_id}": quantity for item_type, item_id, quantity in most_traded
+        },
+        "trade_success_rate": completed_trades / total_trades * 100 if total_trades > 0 else 0,
+        "inventory_turnover_rate": shipped / stock if stock > 0 else 0,
+        "low_stock_items": low_stock_items,
+        "trade_volume_by_type": volume_by_type
+    }
@@ -0,0 +1,48 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+
+def fetch(session: requests.Session, url: str) -> float:
+    """Request the URL and return the latency in seconds."""
+    started = time.perf_counter()
+    response = session.get(url)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+def benchmark(base_url: str, path: str, requests_total: int, concurrency: int) -> None:
+    """Fire concurrent GET requests at a running API and report throughput."""
+    url = f"{base_url.rstrip('/')}{settings.API_V1_STR}{path}"
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(lambda _: fetch(session, url), range(requests_total)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{requests_total} requests to {url} with concurrency {concurrency}")
+    print(f"Throughput: {requests_total / elapsed:.1f} requests/s")
+    print(f"Latency p50: {latencies[len(latencies) // 2] * 1000:.1f} ms")
+    print(f"Latency p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    # Run against a single uvicorn worker before and after a change, e.g.
+    # python scripts/benchmark_concurrency.py --path /competitions/1/stats
+    parser = argparse.ArgumentParser(description="Measure concurrent request throughput")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/competitions/")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.base_url, args.path, args.requests, args.concurrency)
@@ -0,0 +1,68 @@
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.v1.schemas.album import AlbumResponse
+from app.api.v1.serialization import list_response
+from app.models import Album, AlbumSection
+
+def build_page(page_size: int, sections: int) -> list:
+    """Unsaved albums with sections, shaped like a page of list_albums."""
+    now = datetime.utcnow()
+    albums = []
+    for album_id in range(1, page_size + 1):
+        album = Album(
+            id=album_id, competition_id=1, album_title=f"Album {album_id}",
+            album_edition="standard", album_cover_type="softcover", album_language="en",
+            album_publisher="Panini", album_total_stickers=670, album_release_year=2022,
+            created_at=now, updated_at=now
+        )
+        album.sections = [
+            AlbumSection(
+                id=album_id * sections + order, album_id=album_id,
+                album_section_name=f"Section {order}", album_section_order=order,
+                album_section_type="teams", album_section_sticker_count=20,
+                created_at=now, updated_at=now
+            )
+            for order in range(sections)
+        ]
+        albums.append(album)
+    return albums
+
+def validated_json(albums: list) -> bytes:
+    """The default path: validate into the response model, then encode with json."""
+    content = jsonable_encoder([AlbumResponse.from_orm(album) for album in albums])
+    return json.dumps(content, separators=(",", ":")).encode()
+
+def direct_json(albums: list) -> bytes:
+    """The list endpoint path: read rows straight into dicts and encode with orjson."""
+    return list_response(albums, AlbumResponse).body
+
+def benchmark(page_size: int, sections: int, iterations: int) -> None:
+    """Report the per-page serialization cost of both response paths."""
+    albums = build_page(page_size, sections)
+    assert json.loads(validated_json(albums)) == json.loads(direct_json(albums))
+
+    print(f"{page_size} albums with {sections} sections each, {iterations} iterations")
+    for name, serialize in (("validated + json", validated_json), ("direct + orjson", direct_json)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            serialize(albums)
+        elapsed = (time.perf_counter() - started) / iterations
+        print(f"{name:18} {elapsed * 1000:8.2f} ms/page")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare list response serialization cost")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    benchmark(args.page_size, args.sections, args.iterations)
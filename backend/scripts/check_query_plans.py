@@ -0,0 +1,163 @@
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi import Response
+from sqlalchemy import ARRAY, JSON, Boolean, DateTime, Float, Integer, LargeBinary, text
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints import albums, boxes, cards, competitions, memorabilia, packs, stickers, trading
+from app.api.v1.pagination import Page
+from app.db.session import Base, SessionLocal
+from app.models import (
+    Album, Box, Card, CollectorAlbum, CollectorBox, CollectorCard, CollectorMemorabilia,
+    CollectorPack, CollectorSticker, CompanyInventory, Competition, Memorabilia, Pack,
+    Sticker, TradeRequest
+)
+
+# Rows seeded into every table the checked queries read
+SEED_ROWS = 20000
+
+# Distinct values of the first foreign key of each seeded table, and of string columns
+SEED_PARENTS = 2000
+SEED_STRINGS = 500
+
+SEED_TABLES = (
+    "competitions", "albums", "album_sections", "collectors", "collector_albums",
+    "stickers", "collector_stickers", "cards", "collector_cards", "packs",
+    "collector_packs", "boxes", "collector_boxes", "memorabilia",
+    "collector_memorabilia", "company_inventory", "trade_requests", "trade_items",
+)
+
+# (query builder, filters, sort keys, index the plan must use). The builders
+# are the ones the list endpoints page over; the sort keys match their
+# page.apply calls, and an empty tuple means the endpoint is not paged.
+#
+# Not covered: the trade item and inventory movement indexes, which serve
+# the selectin loads and ledger queries rather than list endpoint filters.
+PLAN_CHECKS = [
+    (competitions.list_competitions_query, dict(competition_type="v1", year=1),
+     (Competition.id,), "ix_competitions_type_year"),
+    (competitions.list_competitions_query, dict(host_country="v1"),
+     (Competition.id,), "ix_competitions_host_country"),
+    (albums.list_albums_query, dict(competition_id=1, edition="v1"),
+     (Album.id,), "ix_albums_competition_id_edition"),
+    (albums.list_albums_query, dict(edition="v1"),
+     (Album.id,), "ix_albums_edition"),
+    (albums.list_album_sections_query, dict(album_id=1),
+     (), "ix_album_sections_album_id_order"),
+    (albums.list_collector_albums_query, dict(collector_id=1, completion_status="complete"),
+     (CollectorAlbum.id,), "ix_collector_albums_collector_id_completion"),
+    (stickers.list_album_stickers_query, dict(album_id=1),
+     (Sticker.sticker_slot, Sticker.id), "ix_stickers_album_id_slot"),
+    (stickers.list_missing_stickers_query, dict(collector_album_id=1),
+     (Sticker.sticker_slot, Sticker.id), "ix_stickers_album_id_slot"),
+    (stickers.list_collector_stickers_query, dict(collector_album_id=1),
+     (CollectorSticker.id,), "uq_collector_stickers_album_sticker"),
+    (cards.list_cards_query, dict(competition_id=1, edition="v1"),
+     (Card.id,), "ix_cards_competition_id_edition"),
+    (cards.list_cards_query, dict(player="v123"),
+     (Card.id,), "ix_cards_player_name_trgm"),
+    (cards.list_cards_query, dict(team="v123"),
+     (Card.id,), "ix_cards_team_trgm"),
+    (cards.list_collector_cards_query, dict(collector_id=1),
+     (CollectorCard.id,), "uq_collector_cards_collector_card"),
+    (packs.list_packs_query, dict(album_id=1, edition="v1"),
+     (Pack.id,), "ix_packs_album_id_edition"),
+    (packs.list_collector_packs_query, dict(collector_id=1),
+     (CollectorPack.id,), "uq_collector_packs_collector_pack"),
+    (boxes.list_boxes_query, dict(album_id=1, edition="v1"),
+     (Box.id,), "ix_boxes_album_id_edition"),
+    (boxes.list_collector_boxes_query, dict(collector_id=1),
+     (CollectorBox.id,), "uq_collector_boxes_collector_box"),
+    (memorabilia.list_memorabilia_query, dict(album_id=1, memorabilia_type="v1"),
+     (Memorabilia.id,), "ix_memorabilia_album_id_type"),
+    (memorabilia.list_collector_memorabilia_query, dict(collector_id=1),
+     (CollectorMemorabilia.id,), "uq_collector_memorabilia_collector_memorabilia"),
+    (trading.list_trade_requests_query, dict(collector_id=1, status="v1"),
+     (TradeRequest.id,), "ix_trade_requests_collector_id_status"),
+    (trading.list_trade_requests_query, dict(status="v1"),
+     (TradeRequest.id,), "ix_trade_requests_status"),
+    (trading.list_inventory_query, dict(item_type="v1"),
+     (CompanyInventory.id,), "ix_company_inventory_item"),
+]
+
+def _seed_value(table, column) -> str:
+    """SQL expression over generate_series value g for one seeded column"""
+    if column.name == "id":
+        return "g"
+    if column.foreign_keys:
+        # The first foreign key groups rows under a parent; later ones stay
+        # unique so (owner, item) unique constraints hold
+        first = next(c for c in table.columns if c.foreign_keys)
+        return f"(g % {SEED_PARENTS}) + 1" if column is first else "g"
+    if isinstance(column.type, (ARRAY, JSON)):
+        return "NULL"
+    if isinstance(column.type, Boolean):
+        return "g % 2 = 0"
+    if isinstance(column.type, Integer):
+        return "(g % 5) + 1" if column.name.endswith("rarity_level") else "g"
+    if isinstance(column.type, Float):
+        return "(g % 101)::float"
+    if isinstance(column.type, DateTime):
+        return "now() - g * interval '1 second'"
+    if isinstance(column.type, LargeBinary):
+        return "''::bytea"
+    return f"'v' || (g % {SEED_STRINGS})"
+
+def seed(db) -> None:
+    """Fill the checked tables with generated rows inside the current transaction"""
+    # Seeded foreign keys point at seeded rows, but collectors reference users,
+    # which this schema does not own; skip foreign key triggers (superuser only)
+    db.execute(text("SET LOCAL session_replication_role = replica"))
+    for name in SEED_TABLES:
+        table = Base.metadata.tables[name]
+        columns = list(table.columns)
+        db.execute(text(
+            f"INSERT INTO {name} ({', '.join(c.name for c in columns)}) "
+            f"SELECT {', '.join(_seed_value(table, c) for c in columns)} "
+            f"FROM generate_series(1, {SEED_ROWS}) AS g"
+        ))
+        db.execute(text(f"ANALYZE {name}"))
+
+def _index_names(node):
+    """Yield the name of every index an EXPLAIN JSON plan reads"""
+    if "Index Name" in node:
+        yield node["Index Name"]
+    for child in node.get("Plans", []):
+        yield from _index_names(child)
+
+def check_query_plans() -> None:
+    """Fail unless each list endpoint query is planned with its intended index."""
+    db = SessionLocal()
+    failures = []
+    try:
+        seed(db)
+        for builder, filters, keys, expected in PLAN_CHECKS:
+            query = builder(db, **filters)
+            if keys:
+                query = Page(Response(), None, 0, 100).paged(query, *keys)
+            sql = query.statement.compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+            # Sent as driver SQL: the compiled literals already escape % for the driver
+            explain = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = explain.scalar()[0]["Plan"]
+            used = sorted(set(_index_names(plan)))
+            status = "ok" if expected in used else "MISSING"
+            if status != "ok":
+                failures.append(f"{builder.__name__}({filters}) expected {expected}")
+            print(f"{status:8} {builder.__name__} {filters}: {', '.join(used) or 'no index'}")
+    finally:
+        # Discards the seed rows along with the statistics ANALYZE gathered on them
+        db.rollback()
+        db.close()
+    if failures:
+        sys.exit("Queries not using their index:\n" + "\n".join(failures))
+
+if __name__ == "__main__":
+    # Run against a throwaway migrated database as a superuser, e.g. in CI
+    # after `alembic upgrade head`
+    check_query_plans()
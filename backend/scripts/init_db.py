@@ -5,7 +5,9 @@ from pathlib import Path
 # Add the parent directory to Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from sqlalchemy import create_engine
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
 from sqlalchemy_utils import database_exists, create_database
 from app.core.config import settings
 from app.models import Base
@@ -19,10 +21,23 @@ def init_db() -> None:
         create_database(engine.url)
         print(f"Created database: {settings.POSTGRES_DB}")
     
+    is_fresh = not inspect(engine).get_table_names()
+
     # Create all tables
     Base.metadata.create_all(bind=engine)
     print("Database tables created successfully!")
 
+    if not is_fresh:
+        # Existing schemas are brought up to date with `alembic upgrade head`
+        return
+
+    # Fresh tables already match the latest models, so mark every migration as applied
+    backend_dir = Path(__file__).parent.parent
+    alembic_cfg = Config(str(backend_dir / "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", str(backend_dir / "alembic"))
+    command.stamp(alembic_cfg, "head")
+    print("Database stamped with the latest migration!")
+
 if __name__ == "__main__":
     print("Initializing database...")
     init_db()
@@ -0,0 +1,47 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.inventory import reconcile_inventory, snapshot_inventory_balances
+
+def snapshot(chunk_size: int) -> None:
+    """Snapshot inventory balances so as-of queries fold fewer movements."""
+    db = SessionLocal()
+    try:
+        written = snapshot_inventory_balances(db, chunk_size)
+        print(f"Wrote {written} inventory balance snapshots")
+    finally:
+        db.close()
+
+def reconcile(chunk_size: int) -> None:
+    """Report inventory counters that disagree with the movement ledger."""
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_inventory(db, chunk_size)
+    finally:
+        db.close()
+
+    for mismatch in mismatches:
+        print(
+            f"Inventory {mismatch['inventory_id']}: "
+            f"available {mismatch['available']} (ledger {mismatch['ledger_available']}), "
+            f"allocated {mismatch['allocated']} (ledger {mismatch['ledger_allocated']})"
+        )
+    print(f"{len(mismatches)} inventory items out of balance")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    # Meant to run periodically, e.g. snapshot nightly and reconcile hourly
+    parser = argparse.ArgumentParser(description="Snapshot and reconcile inventory balances")
+    parser.add_argument("command", choices=["snapshot", "reconcile"])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    if args.command == "snapshot":
+        snapshot(args.chunk_size)
+    else:
+        reconcile(args.chunk_size)
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.idempotency import purge_expired_idempotency_keys
+
+def purge_idempotency_keys() -> None:
+    """Delete stored Idempotency-Key responses past their expiry."""
+    db = SessionLocal()
+    try:
+        purged = purge_expired_idempotency_keys(db)
+        print(f"Purged {purged} expired idempotency keys")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Meant to run periodically, e.g. from cron every hour
+    purge_idempotency_keys()
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.services.statistics import refresh_stale_competition_statistics
+
+def refresh_statistics() -> None:
+    """Recompute statistics rollups marked stale by writes."""
+    db = SessionLocal()
+    try:
+        competition_ids = refresh_stale_competition_statistics(db)
+        print(f"Refreshed statistics for {len(competition_ids)} competitions")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Meant to run periodically, e.g. from cron every minute
+    refresh_statistics()
@@ -0,0 +1,86 @@
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import SessionLocal
+from app.models import CompanyInventory, InventoryMovement, MovementTypes
+from app.services.inventory import InsufficientInventory, record_movement
+
+def move(inventory_id: int, movement_type: str, quantity: int) -> bool:
+    """Record one movement in its own transaction, False when it was rejected."""
+    db = SessionLocal()
+    try:
+        record_movement(db, inventory_id, movement_type, quantity)
+        db.commit()
+        return True
+    except InsufficientInventory:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+def stress(stock: int, movements: int, workers: int) -> None:
+    """Race shipments and allocations against a fixed stock and check the totals."""
+    db = SessionLocal()
+    inventory = CompanyInventory(
+        company_inventory_item_type="sticker",
+        company_inventory_item_id=0,
+        company_inventory_quantity_available=stock,
+        company_inventory_quantity_allocated=0
+    )
+    db.add(inventory)
+    db.commit()
+    inventory_id = inventory.id
+
+    # Alternate shipments and allocations so both columns are contended
+    movement_types = [
+        MovementTypes.SHIPPED if i % 2 else MovementTypes.ALLOCATED
+        for i in range(movements)
+    ]
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda movement_type: (movement_type, move(inventory_id, movement_type, 1)),
+                movement_types
+            ))
+
+        shipped = sum(1 for movement_type, ok in results if ok and movement_type == MovementTypes.SHIPPED)
+        allocated = sum(1 for movement_type, ok in results if ok and movement_type == MovementTypes.ALLOCATED)
+        rejected = sum(1 for _, ok in results if not ok)
+
+        db.expire_all()
+        inventory = db.query(CompanyInventory).get(inventory_id)
+        recorded = db.query(InventoryMovement).filter(
+            InventoryMovement.inventory_id == inventory_id
+        ).count()
+
+        print(f"{shipped} shipped, {allocated} allocated, {rejected} rejected")
+        print(f"Available {inventory.company_inventory_quantity_available}, "
+              f"allocated {inventory.company_inventory_quantity_allocated}")
+        assert inventory.company_inventory_quantity_available == stock - shipped - allocated
+        assert inventory.company_inventory_quantity_allocated == allocated
+        assert inventory.company_inventory_quantity_available >= 0
+        assert recorded == shipped + allocated
+        print("No lost updates")
+    finally:
+        db.query(InventoryMovement).filter(
+            InventoryMovement.inventory_id == inventory_id
+        ).delete(synchronize_session=False)
+        db.query(CompanyInventory).filter(
+            CompanyInventory.id == inventory_id
+        ).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+if __name__ == "__main__":
+    # Needs a running database; the rows it creates are removed afterwards
+    parser = argparse.ArgumentParser(description="Stress concurrent inventory movements")
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--movements", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    stress(args.stock, args.movements, args.workers)
@@ -0,0 +1,62 @@
+import pytest
+
+from app.db.query_counter import assert_max_queries
+from app.models import Collector, TradeItem, TradeRequest, TradeStatusTypes
+
+# One query for the page of trade requests, one batch loading their items
+TRADE_REQUEST_PAGE_QUERIES = 2
+
+def add_trade_requests(db, collector: Collector, count: int) -> None:
+    """Add pending trade requests with an incoming and an outgoing item each"""
+    for _ in range(count):
+        trade_request = TradeRequest(
+            collector_id=collector.id,
+            trade_requests_status=TradeStatusTypes.PENDING,
+            trade_requests_shipping_address="1 Stadium Road"
+        )
+        trade_request.trade_items = [
+            TradeItem(trade_item_type="sticker", trade_item_quantity=2, trade_item_is_incoming=True),
+            TradeItem(trade_item_type="card", trade_item_quantity=1, trade_item_is_incoming=False),
+        ]
+        db.add(trade_request)
+    db.commit()
+
+def list_query_count(client, path: str, expected_rows: int) -> int:
+    with assert_max_queries(TRADE_REQUEST_PAGE_QUERIES) as stats:
+        response = client.get(path)
+    assert response.status_code == 200
+    assert len(response.json()) == expected_rows
+    return stats.count
+
+@pytest.mark.parametrize("include_collector", [False, True])
+def test_list_trade_requests_query_count_does_not_grow_with_page(client, db, include_collector):
+    collector = Collector(user_id=1, collector_display_name="Ana")
+    db.add(collector)
+    db.commit()
+    path = f"/api/v1/trading/requests?include_collector={str(include_collector).lower()}"
+
+    add_trade_requests(db, collector, 5)
+    small_page = list_query_count(client, path, 5)
+    add_trade_requests(db, collector, 25)
+    large_page = list_query_count(client, path, 30)
+
+    assert small_page == large_page
+
+    if include_collector:
+        trade_request = client.get(path).json()[0]
+        assert trade_request["collector_display_name"] == "Ana"
+
+@pytest.mark.parametrize("include_collector", [False, True])
+def test_get_trade_request_query_count(client, db, include_collector):
+    collector = Collector(user_id=1, collector_display_name="Ana")
+    db.add(collector)
+    db.commit()
+    add_trade_requests(db, collector, 1)
+    trade_request_id = db.query(TradeRequest.id).scalar()
+
+    with assert_max_queries(TRADE_REQUEST_PAGE_QUERIES):
+        response = client.get(
+            f"/api/v1/trading/request/{trade_request_id}?include_collector={str(include_collector).lower()}"
+        )
+    assert response.status_code == 200
+    assert len(response.json()["trade_items"]) == 2